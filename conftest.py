@@ -1,3 +1,5 @@
+import gc
+
 import pytest
 
 
@@ -6,6 +8,18 @@ def _isolate_home(tmp_home_dir):
     """Isolate the tests from a developer's VCS config."""
 
 
+@pytest.fixture
+def mixed_in():
+    """
+    Return a function combining a mix-in with a Repo class, for the
+    duration of the test only: classes are freed only by the cycle
+    collector, and until then Repo detection in other tests would find
+    the combination among the subclasses.
+    """
+    yield lambda mixin, cls: type(cls.__name__, (mixin, cls), {})
+    gc.collect()
+
+
 rev1 = dict(
     bar=dict(
         baz="",
@@ -1,13 +1,33 @@
 """
 >>> repo().get_current_version()
 '...'
+>>> from jaraco.vcs import Repo
 >>> isinstance(repo(), Repo)
 True
+
+The backends are imported on first use, so that importing the package
+stays cheap.
 """
 
-from .base import Repo
-from .subprocess import Git, Mercurial
+import importlib
 
 __all__ = ['Repo', 'repo', 'Mercurial', 'Git']
 
-repo = Repo.detect
+_lazy = dict(Repo='base', Git='subprocess', Mercurial='subprocess')
+
+
+def repo(location='.'):
+    """
+    Detect the repo at location.
+    """
+    from .base import Repo
+
+    return Repo.detect(location)
+
+
+def __getattr__(name):
+    try:
+        module = importlib.import_module(f'.{_lazy[name]}', __name__)
+    except KeyError:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}") from None
+    return getattr(module, name)
@@ -0,0 +1,152 @@
+"""
+Coroutine-based variants of the command repos, running the VCS
+executable on the asyncio subprocess transport and sharing the output
+parsing of the ``cmd`` classes.
+
+>>> import asyncio
+>>> repo = getfixture('git_repo')
+>>> asyncio.run(Git(repo.location).get_tags())
+set()
+"""
+
+from __future__ import annotations
+
+import asyncio
+import subprocess
+import time
+
+import dateutil.parser
+
+from . import cmd, instrument
+
+
+class Command:
+    env = None
+
+    def __init__(self, location='.'):
+        self.location = location
+
+    def __repr__(self):
+        return f'{self.__class__.__name__}({self.location})'
+
+    async def _invoke(self, *params):
+        """
+        Invoke self.exe as an asyncio subprocess
+        """
+        start = time.perf_counter()
+        proc = await asyncio.create_subprocess_exec(
+            self.exe,
+            *params,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.PIPE,
+            cwd=self.location,
+            env=self.env,
+        )
+        stdout, stderr = await proc.communicate()
+        if instrument.hooks:
+            argv = [self.exe, *params]
+            sizes = len(stdout), len(stderr)
+            instrument.emit(self, argv, start, *sizes, proc.returncode)
+        if not proc.returncode == 0:
+            raise RuntimeError(stderr.strip() or stdout.strip())
+        return stdout.decode('utf-8')
+
+    async def is_valid(self):
+        try:
+            await self._invoke('status')
+        except Exception:
+            return False
+        return True
+
+    async def version(self):
+        """
+        Return the underlying version
+        """
+        output = await self._invoke('version')
+        return self._sync._parse_version(output.splitlines()[0].strip())
+
+    async def get_parent_tags(self, rev=None):
+        try:
+            (parent_rev,) = await self.get_parent_revs(rev)
+        except Exception:
+            return None
+        return await self.get_tags(parent_rev)
+
+    async def get_timestamp(self, rev):
+        return dateutil.parser.parse(await self._get_timestamp_str(rev))
+
+    async def _get_timestamp_str(self, rev):
+        return await self._invoke(*self._sync._timestamp_cmd(rev))
+
+
+class Mercurial(Command):
+    exe = cmd.Mercurial.exe
+    _sync = cmd.Mercurial
+
+    async def find_files(self):
+        return (await self._invoke(*self._sync._find_files_cmd)).splitlines()
+
+    async def get_parent_revs(self, rev=None):
+        out = await self._invoke(*self._sync._parent_revs_cmd(rev))
+        return list(self._sync._parse_parent_revs(out))
+
+    async def get_tags(self, rev=None):
+        out = await self._invoke(*self._sync._identify_tags_cmd(rev))
+        return self._sync._parse_identify_tags(out)
+
+    async def _read_tags_for_revset(self, spec):
+        out = await self._invoke(*self._sync._log_cmd(spec))
+        return list(self._sync._parse_log_tags(out))
+
+    async def get_repo_tags(self):
+        return list(self._sync._parse_tagged_revisions(await self._invoke('tags')))
+
+    async def get_ancestral_tags(self, rev='.'):
+        return await self._read_tags_for_revset(self._sync._ancestral_spec(rev))
+
+    async def is_modified(self):
+        return bool(await self._invoke('status', '-mard'))
+
+    async def describe_version(self):
+        output, dirty = await asyncio.gather(
+            self._invoke(*self._sync._describe_cmd), self.is_modified()
+        )
+        return self._sync._parse_describe(output)._replace(dirty=dirty)
+
+
+class Git(Command):
+    exe = cmd.Git.exe
+    _sync = cmd.Git
+
+    async def find_files(self):
+        return (await self._invoke('ls-files')).splitlines()
+
+    async def get_tags(self, rev=None):
+        rev = rev or 'HEAD'
+        return set((await self._invoke('tag', '--points-at', rev)).splitlines())
+
+    async def get_repo_tags(self):
+        out = await self._invoke(*self._sync._repo_tags_cmd)
+        return list(self._sync._parse_repo_tags(out))
+
+    async def get_ancestral_tags(self, rev=None):
+        out = await self._invoke(*self._sync._ancestral_tags_cmd(rev))
+        return list(self._sync._parse_repo_tags(out))
+
+    async def is_modified(self):
+        return bool(await self._invoke(*self._sync._diff_cmd))
+
+    async def head_date(self):
+        return dateutil.parser.parse(await self._invoke(*self._sync._head_date_cmd))
+
+    async def describe_version(self):
+        output, dirty = await asyncio.gather(
+            self._invoke(*self._sync._describe_log_cmd), self.is_modified()
+        )
+        desc = self._sync._parse_describe_log(output)
+        if desc is None:
+            output, date = await asyncio.gather(
+                self._invoke(*self._sync._describe_cmd), self.head_date()
+            )
+            desc = self._sync._parse_describe(output, date)
+        return desc._replace(dirty=dirty)
@@ -5,16 +5,27 @@ an interface to source code repository functionality.
 
 from __future__ import annotations
 
-import itertools
 import os.path
 import posixpath
 from collections.abc import Iterable
 
-import dateutil.parser
-from more_itertools import one
-
 import jaraco.versioning as versioning
-from jaraco.classes.ancestry import iter_subclasses
+
+
+def find_marker(location, name):
+    """
+    Return the path of the file or directory called name in location
+    or its nearest ancestor, or None if there is none.
+    """
+    path = os.path.abspath(location)
+    while True:
+        candidate = os.path.join(path, name)
+        if os.path.exists(candidate):
+            return candidate
+        parent = os.path.dirname(path)
+        if parent == path:
+            return None
+        path = parent
 
 
 class Repo(versioning.VersionManagement):
@@ -23,6 +34,15 @@ class Repo(versioning.VersionManagement):
     repositories.
     """
 
+    marker: str | None = None
+    """
+    Name of the file or directory that marks the root of a repo
+    (e.g. ``.git``), used to cheaply rule out a location during detection.
+    """
+
+    _detection_cache: dict[tuple, tuple[tuple[int, int], bool]] = {}
+    _detection_cache_size = 1024
+
     def __init__(self, location='.'):
         self.location = location
         self.setup()
@@ -34,18 +54,67 @@ class Repo(versioning.VersionManagement):
     def setup(self):
         pass
 
+    @classmethod
+    def get_priority(cls, location):
+        """
+        Return the precedence of this implementation in detecting a
+        repo at location.
+        """
+        return getattr(cls, 'priority', 0)
+
     @classmethod
     def get_valid_managers(cls, location):
         """
         Get the valid Repo implementations for this location.
         """
+        from jaraco.classes.ancestry import iter_subclasses
 
-        def by_priority_attr(c):
-            return getattr(c, 'priority', 0)
+        from . import persistent, subprocess  # noqa: F401
 
-        classes = sorted(iter_subclasses(cls), key=by_priority_attr, reverse=True)
+        def by_priority(c):
+            return c.get_priority(location)
+
+        classes = sorted(iter_subclasses(cls), key=by_priority, reverse=True)
         instances = (c(location) for c in classes)
-        return (inst for inst in instances if inst.is_valid())
+        return (inst for inst in instances if inst._is_valid_cached())
+
+    def _is_valid_cached(self):
+        """
+        Like is_valid, but first probe the filesystem for the marker and
+        reuse a prior result for this location until the marker is
+        replaced.
+
+        The marker is identified by device and inode rather than mtime,
+        as querying a repo (e.g. ``git status`` refreshing the index)
+        routinely touches the marker directory.
+        """
+        if self.marker is None:
+            return self.is_valid()
+        path = find_marker(self.location, self.marker)
+        if path is None:
+            return False
+        try:
+            stat = os.stat(path)
+        except OSError:
+            return self.is_valid()
+        identity = stat.st_dev, stat.st_ino
+        # by name, so as not to keep classes (e.g. mix-in combinations) alive
+        key = (
+            f'{type(self).__module__}.{type(self).__qualname__}',
+            getattr(self, 'exe', None),
+            os.path.realpath(self.location),
+            path,
+        )
+        cache = self._detection_cache
+        cached = cache.get(key)
+        if cached is not None and cached[0] == identity:
+            return cached[1]
+        valid = self.is_valid()
+        if len(cache) >= self._detection_cache_size:
+            # evict the oldest
+            cache.pop(next(iter(cache)), None)
+        cache[key] = identity, valid
+        return valid
 
     @staticmethod
     def detect(location='.'):
@@ -71,6 +140,14 @@ class Repo(versioning.VersionManagement):
     def find_files(self):
         raise NotImplementedError()
 
+    def iter_files(self, decode=True):
+        """
+        Iterate over the files in the repo without loading the full
+        listing, yielding str or, if not decode, bytes.
+        """
+        files = iter(self.find_files())
+        return files if decode else map(os.fsencode, files)
+
     def get_tags(self, rev=None):
         """
         Get the tags for the specified revision (or the current revision
@@ -89,6 +166,8 @@ class Repo(versioning.VersionManagement):
         Return the tags for the parent revision (or None if no single
             parent can be identified).
         """
+        from more_itertools import one
+
         try:
             parent_rev = one(self.get_parent_revs(rev))
         except Exception:
@@ -106,17 +185,61 @@ class Repo(versioning.VersionManagement):
         'Does the current working copy have modifications'
         raise NotImplementedError()
 
-    def find_all_files(self):
+    subrepo_workers = 8
+    """
+    The maximum number of subrepos find_all_files surveys concurrently.
+    """
+
+    def find_all_files(self, max_workers=None):
         """
-        Find files including those in subrepositories.
+        Find files including those in subrepositories, recursively.
+
+        Subrepos are discovered and listed on a pool of at most
+        max_workers threads, but files are yielded in a deterministic
+        order: those of each repo, followed depth-first by those of its
+        subrepos in the order they are declared.
         """
-        files = self.find_files()
-        subrepo_files = (
-            posixpath.join(subrepo.location, filename)
-            for subrepo in self.subrepos()
-            for filename in subrepo.find_files()
+        import concurrent.futures
+
+        executor = concurrent.futures.ThreadPoolExecutor(
+            max_workers or self.subrepo_workers
         )
-        return itertools.chain(files, subrepo_files)
+
+        def survey(repo):
+            files = repo.find_files()
+            children = [executor.submit(survey, sub) for sub in repo.subrepos()]
+            return repo, files, children
+
+        def collect(future, nested=False):
+            repo, files, children = future.result()
+            for filename in files:
+                yield posixpath.join(repo.location, filename) if nested else filename
+            for child in children:
+                yield from collect(child, nested=True)
+
+        try:
+            yield from collect(executor.submit(survey, self))
+        finally:
+            executor.shutdown(cancel_futures=True)
+
+    def iter_all_files(self, decode=True):
+        """
+        Like find_all_files, but streaming, as with iter_files, from one
+        repo at a time.
+        """
+        yield from self.iter_files(decode)
+        for subrepo in self.walk_subrepos():
+            prefix = subrepo.location if decode else os.fsencode(subrepo.location)
+            for filename in subrepo.iter_files(decode):
+                yield posixpath.join(prefix, filename)
+
+    def walk_subrepos(self):
+        """
+        Generate the subrepos of this repo, recursively, depth-first.
+        """
+        for subrepo in self.subrepos():
+            yield subrepo
+            yield from subrepo.walk_subrepos()
 
     def subrepos(self):
         paths = (os.path.join(self.location, path) for path in self.sub_paths())
@@ -125,9 +248,42 @@ class Repo(versioning.VersionManagement):
     def sub_paths(self):
         raise NotImplementedError()
 
+    def session(self):
+        """
+        Return a session.Session on this repo, for use as a context
+        manager, answering queries against the revision current on entry.
+        """
+        from .session import Session
+
+        return Session(self)
+
+    def _session_backend(self):
+        """
+        Return the Repo that runs the queries of a session.
+        """
+        return self
+
+    def _working_revs(self):
+        """
+        Resolve the current revision, returning it with the parents of
+        the working copy (or None if those are the current revision's)
+        and whether the working copy has local modifications that leave
+        it without tags.
+        """
+        raise NotImplementedError()
+
     def get_timestamp(self, rev):
+        import dateutil.parser
+
         return dateutil.parser.parse(self._get_timestamp_str(rev))
 
+    def get_timestamps(self, revs):
+        """
+        Return a dict mapping each of revs to its timestamp.
+        Implementations may override this to query them all at once.
+        """
+        return {rev: self.get_timestamp(rev) for rev in revs}
+
     def age(self):
         """
         Return the age of the repo.
@@ -0,0 +1,72 @@
+"""
+Run queries against many repositories concurrently.
+
+>>> repo = getfixture('git_repo')
+>>> (result,) = query([repo.location], {'tags': lambda repo: repo.get_tags()})
+>>> result.values
+{'tags': set()}
+"""
+
+from __future__ import annotations
+
+import concurrent.futures
+import typing
+from collections.abc import Callable, Iterable, Iterator, Mapping
+
+from .base import Repo
+
+default_queries: Mapping[str, Callable[[Repo], object]] = {
+    'version': lambda repo: repo.get_current_version(),
+    'tags': lambda repo: repo.get_tags(),
+    'modified': lambda repo: repo.is_modified(),
+}
+
+
+class Result(typing.NamedTuple):
+    """
+    The outcome of querying a single location: the detected repo
+    and the value of each query, or the exception that stopped it.
+    """
+
+    location: str
+    repo: Repo | None
+    values: dict[str, object]
+    error: Exception | None = None
+
+
+def query_one(location, queries=default_queries):
+    """
+    Detect the repo at location and run each of queries against it.
+    """
+    try:
+        repo = Repo.detect(location)
+    except Exception as exc:
+        return Result(location, None, {}, exc)
+    values = {}
+    try:
+        for name, func in queries.items():
+            values[name] = func(repo)
+    except Exception as exc:
+        return Result(location, repo, values, exc)
+    return Result(location, repo, values)
+
+
+def query(
+    locations: Iterable[str],
+    queries: Mapping[str, Callable[[Repo], object]] = default_queries,
+    max_workers: int = 8,
+) -> Iterator[Result]:
+    """
+    Query each of locations on a pool of at most max_workers threads,
+    yielding a Result for each as soon as it is complete.
+
+    Errors are captured on the Result for the affected location
+    rather than raised.
+    """
+    executor = concurrent.futures.ThreadPoolExecutor(max_workers=max_workers)
+    try:
+        futures = [executor.submit(query_one, loc, queries) for loc in locations]
+        for future in concurrent.futures.as_completed(futures):
+            yield future.result()
+    finally:
+        executor.shutdown(cancel_futures=True)
@@ -0,0 +1,305 @@
+"""
+Benchmarks of the repo backends against synthetic repos.
+
+Build repos of a given shape and measure each operation on each
+backend, recording its latency and how many commands and processes it
+runs::
+
+    python -m jaraco.vcs.bench --commits 200 --tags 20 --json results.json
+    python -m jaraco.vcs.bench --baseline results.json
+
+With ``--baseline``, the exit status is nonzero if any operation runs
+more processes than before or is slower by more than ``--tolerance``.
+
+>>> spec = Spec(commits=3, tags=1, files=4, submodules=0)
+>>> results = run(spec, repeat=1, backends=['subprocess.Git'])
+>>> sorted(result.operation for result in results)
+['describe_version', 'find_all_files', 'find_files', 'get_repo_tags', 'get_tags', 'get_timestamp', 'is_valid']
+"""
+
+from __future__ import annotations
+
+import argparse
+import collections
+import contextlib
+import importlib.util
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+import typing
+from collections.abc import Callable, Iterable
+
+from . import cmd, library, scaffold
+from .subprocess import Git, Mercurial
+
+
+class Spec(typing.NamedTuple):
+    """
+    The shape of a synthetic repo.
+    """
+
+    commits: int = 50
+    tags: int = 10
+    files: int = 500
+    submodules: int = 2
+
+
+class Result(typing.NamedTuple):
+    """
+    The median latency and the number of commands (invocations) and
+    processes per call of an operation on a backend.
+    """
+
+    backend: str
+    operation: str
+    seconds: float
+    invocations: float
+    processes: float
+    error: str | None = None
+
+
+@contextlib.contextmanager
+def _pushd(path):
+    orig = os.getcwd()
+    os.chdir(path)
+    try:
+        yield
+    finally:
+        os.chdir(orig)
+
+
+def _files(indexes, content):
+    tree: dict[str, dict[str, str]] = collections.defaultdict(dict)
+    for index in indexes:
+        tree[f'dir{index // 100}'][f'file{index}'] = content
+    return dict(tree)
+
+
+def _subrepo(kind, location):
+    repo = generate(kind, location, Spec(commits=1, tags=0, files=3, submodules=0))
+    return repo.location
+
+
+def generate(kind, location, spec: Spec):
+    """
+    Create a repo of kind ('git' or 'hg') at location, with spec.commits
+    commits (the first adding spec.files files, each other changing one)
+    and spec.tags tags spread evenly across them, then add
+    spec.submodules subrepos.
+    """
+    location = os.path.abspath(location)
+    os.makedirs(location, exist_ok=True)
+    if kind == 'git':
+        repo = scaffold.init_git(Git(location))
+    else:
+        repo = scaffold.init_hg(Mercurial(location))
+    tagged = {spec.commits * (n + 1) // spec.tags - 1 for n in range(spec.tags)}
+    with _pushd(location):
+        for commit in range(spec.commits):
+            changed = (
+                range(spec.files) if commit == 0 else [commit % max(spec.files, 1)]
+            )
+            repo.commit_tree(_files(changed, f'revision {commit}'), f'commit {commit}')
+            if commit in tagged:
+                repo._invoke('tag', f'1.{commit}')
+        _add_subrepos(kind, repo, spec.submodules, location + '-sources')
+    return repo
+
+
+def _add_subrepos(kind, repo, count, sources):
+    if not count:
+        return
+    if kind == 'git':
+        for index in range(count):
+            source = _subrepo(kind, os.path.join(sources, f'sub{index}'))
+            repo._invoke(
+                '-c',
+                'protocol.file.allow=always',
+                'submodule',
+                'add',
+                '-q',
+                source,
+                f'sub{index}',
+            )
+    else:
+        for index in range(count):
+            _subrepo(kind, f'sub{index}')
+        with open('.hgsub', 'w', encoding='utf-8') as file:
+            file.writelines(f'sub{index} = sub{index}\n' for index in range(count))
+        repo._invoke('add', '.hgsub')
+    repo._invoke('commit', '-m', 'add subrepos')
+
+
+@contextlib.contextmanager
+def counting(repo):
+    """
+    Count the commands repo invokes and the processes started.
+    """
+    counts: collections.Counter[str] = collections.Counter()
+    orig_popen = subprocess.Popen
+    orig_invoke = repo._invoke
+
+    class Popen(orig_popen):
+        def __init__(self, *args, **kwargs):
+            counts['processes'] += 1
+            super().__init__(*args, **kwargs)
+
+    def _invoke(*params):
+        counts['invocations'] += 1
+        return orig_invoke(*params)
+
+    subprocess.Popen = Popen
+    repo._invoke = _invoke
+    try:
+        yield counts
+    finally:
+        subprocess.Popen = orig_popen
+        del repo._invoke
+
+
+def _head(repo):
+    return 'HEAD' if isinstance(repo, cmd.Git) else '.'
+
+
+default_operations: dict[str, Callable] = {
+    'is_valid': lambda repo: repo.is_valid(),
+    'get_tags': lambda repo: repo.get_tags(),
+    'get_repo_tags': lambda repo: list(repo.get_repo_tags()),
+    'find_files': lambda repo: repo.find_files(),
+    'find_all_files': lambda repo: list(repo.find_all_files()),
+    'describe_version': lambda repo: repo.describe_version(),
+    'get_timestamp': lambda repo: repo.get_timestamp(_head(repo)),
+}
+
+
+def _backends():
+    yield 'subprocess.Git', 'git', Git
+    yield 'subprocess.Mercurial', 'hg', Mercurial
+    if importlib.util.find_spec('mercurial'):
+        yield 'library.Mercurial', 'hg', library.Mercurial
+
+
+def measure(name, repo, operation, repeat=5) -> Result:
+    """
+    Call operation on repo repeat times and summarize.
+    """
+    func = default_operations[operation]
+    timings = []
+    with counting(repo) as counts:
+        for _ in range(repeat):
+            start = time.perf_counter()
+            try:
+                func(repo)
+            except Exception as exc:
+                return Result(name, operation, 0.0, 0, 0, repr(exc))
+            timings.append(time.perf_counter() - start)
+    return Result(
+        name,
+        operation,
+        statistics.median(timings),
+        counts['invocations'] / repeat,
+        counts['processes'] / repeat,
+    )
+
+
+def run(
+    spec: Spec = Spec(),
+    repeat: int = 5,
+    backends: Iterable[str] | None = None,
+    operations: Iterable[str] = tuple(default_operations),
+) -> list[Result]:
+    """
+    Generate a repo of each kind to spec and measure operations on
+    each of backends (all available by default).
+    """
+    selected = [
+        backend
+        for backend in _backends()
+        if backends is None or backend[0] in set(backends)
+    ]
+    results: list[Result] = []
+    with tempfile.TemporaryDirectory(prefix='jaraco.vcs-bench-') as root:
+        locations = {
+            kind: generate(kind, os.path.join(root, kind), spec).location
+            for kind in {kind for _, kind, _ in selected}
+        }
+        for name, kind, factory in selected:
+            repo = factory(locations[kind])
+            results.extend(measure(name, repo, op, repeat) for op in operations)
+            getattr(repo, 'close', lambda: None)()
+    return results
+
+
+def compare(results, baseline, tolerance=1.5):
+    """
+    Return a message for each result that runs more processes than
+    its counterpart in baseline, or is slower by more than tolerance.
+    """
+    reference = {(result.backend, result.operation): result for result in baseline}
+    for result in results:
+        before = reference.get((result.backend, result.operation))
+        if before is None or result.error:
+            continue
+        if result.processes > before.processes:
+            yield (
+                f"{result.backend}.{result.operation}: "
+                f"{result.processes:g} processes (was {before.processes:g})"
+            )
+        if result.seconds > before.seconds * tolerance:
+            yield (
+                f"{result.backend}.{result.operation}: "
+                f"{result.seconds:.4f}s (was {before.seconds:.4f}s)"
+            )
+
+
+def _report(results):
+    for result in results:
+        summary = result.error or (
+            f"{result.seconds * 1000:9.2f} ms  "
+            f"{result.invocations:5g} invocations  {result.processes:5g} processes"
+        )
+        print(f"{result.backend:22} {result.operation:18} {summary}")
+
+
+def main(args=None):
+    parser = argparse.ArgumentParser(prog='python -m jaraco.vcs.bench')
+    for field, default in Spec._field_defaults.items():
+        parser.add_argument(f'--{field}', type=int, default=default)
+    parser.add_argument('--repeat', type=int, default=5)
+    parser.add_argument('--backend', action='append', dest='backends')
+    parser.add_argument(
+        '--operation',
+        action='append',
+        dest='operations',
+        choices=default_operations,
+    )
+    parser.add_argument('--json', help="write the results to this file")
+    parser.add_argument('--baseline', help="compare with results from --json")
+    parser.add_argument('--tolerance', type=float, default=1.5)
+    options = parser.parse_args(args)
+    spec = Spec(*(getattr(options, field) for field in Spec._fields))
+    results = run(
+        spec,
+        options.repeat,
+        options.backends,
+        options.operations or default_operations,
+    )
+    _report(results)
+    if options.json:
+        with open(options.json, 'w', encoding='utf-8') as file:
+            json.dump([result._asdict() for result in results], file, indent=2)
+    if options.baseline:
+        with open(options.baseline, encoding='utf-8') as file:
+            baseline = [Result(**item) for item in json.load(file)]
+        regressions = list(compare(results, baseline, options.tolerance))
+        print(*regressions, sep='\n', file=sys.stderr)
+        return 1 if regressions else 0
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
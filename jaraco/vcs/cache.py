@@ -0,0 +1,164 @@
+"""
+Memoization of VCS queries keyed by resolved revision.
+
+Combine ``Memoized`` with a Repo implementation to cache its queries:
+
+>>> from jaraco.vcs import subprocess
+>>> class Git(Memoized, subprocess.Git):
+...     pass
+>>> repo = Git(getfixture('git_repo').location)
+>>> repo.get_tags()
+set()
+>>> repo.get_tags()
+set()
+>>> repo.cache_info().hits
+1
+"""
+
+from __future__ import annotations
+
+import collections
+import re
+import typing
+
+
+class CacheInfo(typing.NamedTuple):
+    hits: int
+    misses: int
+    maxsize: int
+    currsize: int
+
+
+class LRUCache:
+    """
+    A mapping of bounded size, evicting the least recently used entry.
+    """
+
+    def __init__(self, maxsize=1024):
+        self.maxsize = maxsize
+        self.data: collections.OrderedDict = collections.OrderedDict()
+        self.hits = self.misses = 0
+
+    def lookup(self, key, compute):
+        """
+        Return the value for key, calling compute() to supply it on a miss.
+        """
+        try:
+            value = self.data[key]
+        except KeyError:
+            pass
+        else:
+            self.data.move_to_end(key)
+            self.hits += 1
+            return value
+        self.misses += 1
+        value = self.data[key] = compute()
+        if len(self.data) > self.maxsize:
+            self.data.popitem(last=False)
+        return value
+
+    def clear(self):
+        self.data.clear()
+
+    def info(self):
+        return CacheInfo(self.hits, self.misses, self.maxsize, len(self.data))
+
+
+class RevisionCache:
+    """
+    Caches for the results of queries about immutable revisions,
+    split between results that depend only on the revision and those
+    that also depend on the refs (e.g. tags), which are discarded
+    whenever the refs state changes.
+    """
+
+    def __init__(self, maxsize=1024):
+        self.immutable = LRUCache(maxsize)
+        self.ref_dependent = LRUCache(maxsize)
+        self.refs_state = None
+
+    def lookup(self, key, compute):
+        return self.immutable.lookup(key, compute)
+
+    def lookup_refs(self, key, compute, refs_state):
+        """
+        Like lookup, but for results that depend on the refs, invalidated
+        whenever refs_state differs from that of the previous lookup.
+        A refs_state of None disables caching.
+        """
+        if refs_state is None:
+            return compute()
+        if refs_state != self.refs_state:
+            self.ref_dependent.clear()
+            self.refs_state = refs_state
+        return self.ref_dependent.lookup(key, compute)
+
+    def info(self):
+        caches = self.immutable.info(), self.ref_dependent.info()
+        return CacheInfo(*map(sum, zip(*caches)))
+
+
+def is_full_hash(rev):
+    """
+    Is rev a full hex object id (and thus already resolved)?
+
+    >>> is_full_hash('0' * 40)
+    True
+    >>> is_full_hash('HEAD')
+    False
+    """
+    return bool(re.fullmatch(r'[0-9a-f]{40}|[0-9a-f]{64}', str(rev)))
+
+
+class Memoized:
+    """
+    Mix-in for Repo implementations memoizing queries about immutable
+    revisions. Symbolic revisions are resolved to hashes with
+    ``_resolve_rev`` on each call; results are keyed by hash, and those
+    depending on the refs are invalidated when ``_refs_state`` changes.
+
+    Resolution and the query are separate calls, so a revision that
+    moves in between may be cached under its previous hash.
+    """
+
+    cache_size = 1024
+
+    def setup(self):
+        super().setup()
+        self._revision_cache = RevisionCache(self.cache_size)
+
+    def cache_info(self):
+        """
+        Return the combined hits, misses and sizes of the caches.
+        """
+        return self._revision_cache.info()
+
+    def _resolve(self, rev):
+        return rev if is_full_hash(rev) else self._resolve_rev(rev)
+
+    def get_tags(self, rev=None):
+        tags = self._revision_cache.lookup_refs(
+            ('get_tags', self._resolve(rev)),
+            lambda: frozenset(super(Memoized, self).get_tags(rev)),
+            self._refs_state(),
+        )
+        return set(tags)
+
+    def get_parent_revs(self, rev=None):
+        # the parents of the working copy differ from those of its revision
+        key = 'get_parent_revs', rev is None, self._resolve(rev)
+        parents = self._revision_cache.lookup(
+            key, lambda: tuple(super(Memoized, self).get_parent_revs(rev))
+        )
+        return iter(parents)
+
+    def _get_timestamp_str(self, rev):
+        return self._revision_cache.lookup(
+            ('_get_timestamp_str', self._resolve(rev)),
+            lambda: super(Memoized, self)._get_timestamp_str(rev),
+        )
+
+    def head_date(self):
+        return self._revision_cache.lookup(
+            ('head_date', self._resolve('HEAD')), super(Memoized, self).head_date
+        )
@@ -1,16 +1,23 @@
+from __future__ import annotations
+
 import abc
+import datetime
+import glob
 import itertools
 import operator
 import os.path
 import re
-import subprocess
-import types
 import typing
 
-import dateutil.parser
-from tempora import utc
+from . import base, gitdir, refs
+
 
-import jaraco.path
+def _stat_key(path):
+    try:
+        stat = os.stat(path)
+    except FileNotFoundError:
+        return None
+    return stat.st_mtime_ns, stat.st_size
 
 
 class TaggedRevision(typing.NamedTuple):
@@ -18,10 +25,53 @@ class TaggedRevision(typing.NamedTuple):
     revision: str
 
 
+class Description(typing.NamedTuple):
+    """
+    The current state of a repo relative to its nearest tag, as
+    returned by ``describe_version``.
+    """
+
+    date: datetime.datetime
+    tag: str
+    distance: int
+    node: str
+    dirty: bool
+
+
+def _split_nul(chunks):
+    """
+    Split a stream of byte chunks into its NUL-terminated records.
+
+    >>> list(_split_nul([b'a\\0b', b'c\\0', b'd\\0']))
+    [b'a', b'bc', b'd']
+    """
+    pending = b''
+    for chunk in chunks:
+        *records, pending = (pending + chunk).split(b'\0')
+        yield from records
+    if pending:
+        yield pending
+
+
 class Command(metaclass=abc.ABCMeta):
     @abc.abstractmethod
     def _invoke(self, *args): ...
 
+    def _stream(self, *args):
+        """
+        Yield the output of the command as chunks of bytes. Backends
+        that can read their output incrementally override this.
+        """
+        yield self._invoke(*args).encode('utf-8')
+
+    def _iter_records(self, *args, decode=True):
+        stream = self._stream(*args)
+        records = _split_nul(stream)
+        try:
+            yield from map(os.fsdecode, records) if decode else records
+        finally:
+            stream.close()
+
     def is_valid(self):
         try:
             # Check if both command and repo are valid
@@ -42,9 +92,43 @@ class Command(metaclass=abc.ABCMeta):
     def _parse_version(cls, version):
         return re.search(cls.version_pattern, version).group(1)
 
+    @staticmethod
+    def _parse_tagged_revisions(output):
+        lines = output.splitlines()
+        return (TaggedRevision(*line.rsplit(None, 1)) for line in lines if line)
+
+    _first_commit_dates: dict[str, datetime.datetime] = {}
+
+    def age(self):
+        """
+        Return the time since the first commit.
+
+        >>> repo = getfixture('git_repo')
+        >>> repo.age()
+        datetime.timedelta(...)
+        """
+        return datetime.datetime.now(datetime.timezone.utc) - self.first_commit_date()
+
+    def first_commit_date(self):
+        """
+        Return the date of the earliest root commit, cached for the repo
+        because a root commit never changes.
+        """
+        marker = base.find_marker(self.location, self.marker)
+        key = marker and os.path.realpath(marker)
+        try:
+            return self._first_commit_dates[key]
+        except KeyError:
+            pass
+        date = self._load_first_commit_date()
+        if key:
+            self._first_commit_dates[key] = date
+        return date
+
 
 class Mercurial(Command):
     exe = 'hg'
+    marker: str | None = '.hg'
     version_pattern = r'Mercurial Distributed SCM \((.*?)\)'
 
     def find_root(self):
@@ -53,33 +137,56 @@ class Mercurial(Command):
         except Exception:
             pass
 
+    _find_files_cmd = 'locate', '-I', '.', '--config', 'ui.relative-paths=yes'
+
     def find_files(self):
         """
         Find versioned files in self.location
         """
-        cmd = 'locate', '-I', '.', '--config', 'ui.relative-paths=yes'
-        return self._invoke(*cmd).splitlines()
+        return self._invoke(*self._find_files_cmd).splitlines()
 
-    def get_parent_revs(self, rev=None):
-        cmd = ['parents', '--style', 'default', '--config', 'defaults.parents=']
+    def iter_files(self, decode=True):
+        """
+        Like find_files, but stream the names as the command emits them,
+        as str (or bytes if not decode).
+        """
+        return self._iter_records(*self._find_files_cmd, '-0', decode=decode)
+
+    @staticmethod
+    def _parent_revs_cmd(rev=None):
+        cmd = ['parents', '--template', '{rev}\\n', '--config', 'defaults.parents=']
         if rev:
             cmd.extend(['--rev', str(rev)])
-        out = self._invoke(*cmd)
-        cs_pat = r'^changeset:\s+(?P<local>\d+):(?P<hash>[0-9a-zA-Z]+)'
-        return (match.groupdict()['local'] for match in re.finditer(cs_pat, out))
+        return cmd
+
+    @staticmethod
+    def _parse_parent_revs(out):
+        return iter(out.split())
+
+    def get_parent_revs(self, rev=None):
+        out = self._invoke(*self._parent_revs_cmd(rev))
+        return self._parse_parent_revs(out)
 
     def get_tags(self, rev=None):
         """
         Get the tags for the given revision specifier (or the
         current revision if not specified).
         """
-        rev_num = self._get_rev_num(rev)
-        # rev_num might end with '+', indicating local modifications.
-        return (
-            set(self._read_tags_for_rev(rev_num))
-            if not rev_num.endswith('+')
-            else set()
-        )
+        return self._parse_identify_tags(self._invoke(*self._identify_tags_cmd(rev)))
+
+    @staticmethod
+    def _identify_tags_cmd(rev=None):
+        cmd = ['identify', '--template', '{dirty}\\x00{join(tags, "\\x00")}']
+        cmd.extend(['--config', 'defaults.identify='])
+        if rev:
+            cmd.extend(['--rev', str(rev)])
+        return cmd
+
+    @staticmethod
+    def _parse_identify_tags(out):
+        dirty, *tags = out.split('\0')
+        # a working copy with local modifications has no tags
+        return set() if dirty else set(filter(None, tags))
 
     def _read_tags_for_rev(self, rev_num):
         """
@@ -92,31 +199,83 @@ class Mercurial(Command):
         """
         Return TaggedRevision for each tag/rev combination in the revset spec
         """
-        cmd = ['log', '--style', 'default', '--config', 'defaults.log=', '-r', spec]
-        res = self._invoke(*cmd)
-        header_pattern = re.compile(r'(?P<header>\w+?):\s+(?P<value>.*)')
-        match_res = map(header_pattern.match, res.splitlines())
-        matched_lines = filter(None, match_res)
-        matches = (match.groupdict() for match in matched_lines)
-        for match in matches:
-            if match['header'] == 'changeset':
-                id, sep, rev = match['value'].partition(':')
-            if match['header'] == 'tag':
-                tag = match['value']
-                yield TaggedRevision(tag, rev)
+        return self._parse_log_tags(self._invoke(*self._log_cmd(spec)))
+
+    _log_template = '{node|short}\\x00{join(tags, "\\x00")}\\n'
+
+    @classmethod
+    def _log_cmd(cls, spec):
+        return [
+            'log',
+            '--template',
+            cls._log_template,
+            '--config',
+            'defaults.log=',
+            '-r',
+            spec,
+        ]
+
+    @staticmethod
+    def _parse_log_tags(res):
+        """
+        Parse TaggedRevisions from the output of _log_cmd: per changeset,
+        its short node followed by its tags, NUL-separated.
+        """
+        for line in res.splitlines():
+            rev, *tags = line.split('\0')
+            yield from (TaggedRevision(tag, rev) for tag in tags if tag)
 
     def _get_rev_num(self, rev=None):
         """
         Determine the revision number for a given revision specifier.
         """
+        return self._invoke(*self._rev_num_cmd(rev)).strip()
+
+    @staticmethod
+    def _rev_num_cmd(rev=None):
         # first, determine the numeric ID
         cmd = ['identify', '--num']
         # workaround for #4
         cmd.extend(['--config', 'defaults.identify='])
         if rev:
             cmd.extend(['--rev', rev])
-        res = self._invoke(*cmd)
-        return res.strip()
+        return cmd
+
+    def _resolve_rev(self, rev=None):
+        """
+        Resolve rev (or the working copy) to a full hash, suffixed
+        with '+' for a working copy with local modifications.
+        """
+        cmd = ['identify', '--debug', '--id', '--config', 'defaults.identify=']
+        if rev:
+            cmd.extend(['--rev', str(rev)])
+        return self._invoke(*cmd).strip()
+
+    def _working_revs(self):
+        resolved = self._resolve_rev()
+        parents = resolved.split('+')
+        return (
+            parents[0],
+            [parent for parent in parents if parent],
+            resolved.endswith('+'),
+        )
+
+    def _refs_state(self):
+        """
+        Return a token that changes whenever the tags might have changed.
+        """
+        marker = base.find_marker(self.location, '.hg')
+        if marker is None:
+            return None
+        root = os.path.dirname(marker)
+        cache = os.path.join(marker, 'cache')
+        paths = [
+            os.path.join(root, '.hgtags'),
+            os.path.join(marker, 'localtags'),
+            os.path.join(marker, 'store', '00changelog.i'),
+            *glob.glob(os.path.join(glob.escape(cache), 'tags2*')),
+        ]
+        return tuple(map(_stat_key, paths))
 
     def _get_tags_by_num(self):
         """
@@ -134,21 +293,65 @@ class Mercurial(Command):
         }
 
     def get_repo_tags(self):
-        lines = self._invoke('tags').splitlines()
-        return (TaggedRevision(*line.rsplit(None, 1)) for line in lines if line)
+        return self._parse_tagged_revisions(self._invoke('tags'))
 
     def get_ancestral_tags(self, rev='.'):
         """
         Like get_repo_tags, but only get those tags ancestral to the current
         changeset.
         """
-        spec = 'sort(ancestors({rev}), -date)'.format(**vars())
-        return self._read_tags_for_revset(spec)
+        return self._read_tags_for_revset(self._ancestral_spec(rev))
+
+    @staticmethod
+    def _ancestral_spec(rev):
+        # only tagged changesets are of interest
+        return 'sort(ancestors({rev}) and (tag() or tip), -date)'.format(**vars())
 
     def is_modified(self):
         out = self._invoke('status', '-mard')
         return bool(out)
 
+    _describe_cmd = (
+        'log',
+        '-r',
+        '.',
+        '--template',
+        # only tags with a digit, as for Git's --match '*[0-9]*'
+        "{latesttag(r're:[0-9]')}\t"
+        "{join(latesttag(r're:[0-9]') % '{distance}', ':')}"
+        '\t{node|short}\t{date|rfc3339date}',
+    )
+
+    def describe_version(self):
+        """
+        Describe the working copy parent relative to its latest global
+        tag containing a digit, like ``Git.describe_version`` (with an
+        ``h`` node prefix).
+
+        >>> repo = getfixture('hg_repo')
+        >>> _ = repo._invoke('tag', 'v1.0.0')
+        >>> desc = repo.describe_version()
+        >>> desc.tag, desc.distance, desc.dirty
+        ('v1.0.0', 1, False)
+        >>> desc.node
+        'h...'
+        """
+        desc = self._parse_describe(self._invoke(*self._describe_cmd))
+        return desc._replace(dirty=self.is_modified())
+
+    @staticmethod
+    def _parse_describe(output):
+        tags, distances, node, date = output.split('\t')
+        if tags == 'null':
+            raise RuntimeError("No names found, cannot describe anything.")
+        # several tags on one changeset are joined with ':', each with
+        # the same distance
+        tag = tags.split(':')[0]
+        distance = int(distances.split(':')[0])
+        return Description(
+            datetime.datetime.fromisoformat(date), tag, distance, 'h' + node, False
+        )
+
     def sub_paths(self):
         try:
             with open(os.path.join(self.location, '.hgsub')) as file:
@@ -157,9 +360,65 @@ class Mercurial(Command):
             return ()
 
     def _get_timestamp_str(self, rev):
-        return self._invoke('log', '-l', '1', '--template', '{date|isodate}', '-r', rev)
+        return self._invoke(*self._timestamp_cmd(rev))
+
+    @staticmethod
+    def _timestamp_cmd(rev):
+        return 'log', '-l', '1', '--template', '{date|rfc3339date}', '-r', rev
+
+    def _load_first_commit_date(self):
+        out = self._invoke('log', '-r', '0', '--template', '{date|rfc3339date}')
+        return datetime.datetime.fromisoformat(out)
+
+    def get_timestamps(self, revs):
+        """
+        Return a dict mapping each of revs to its timestamp, as for
+        get_timestamp, from one ``hg log`` call (and another resolving
+        revs to changesets where several of revs name the same one).
+        """
+        revs = list(dict.fromkeys(map(str, revs)))
+        if not revs:
+            return {}
+        out = self._invoke(*self._timestamps_cmd(revs))
+        pairs = [line.split('\t') for line in out.splitlines()]
+        dates = {node: datetime.datetime.fromisoformat(date) for node, date in pairs}
+        nodes = [node for node, _ in pairs]
+        if len(nodes) != len(revs):
+            # hg lists each changeset once
+            nodes = self._invoke(*self._nodes_cmd(revs)).split()
+        return {rev: dates[node] for rev, node in zip(revs, nodes)}
+
+    @staticmethod
+    def _timestamps_cmd(revs):
+        def quote(rev):
+            # as a revset string, so any tag or branch name is a symbol
+            return "'{}'".format(rev.replace('\\', '\\\\').replace("'", "\\'"))
+
+        cmd = ['log', '--template', '{node}\t{date|rfc3339date}\\n']
+        for rev in revs:
+            cmd.extend(['-r', quote(rev)])
+        return cmd
+
+    @staticmethod
+    def _nodes_cmd(revs):
+        """
+        Resolve each of revs to its changeset node, one per line,
+        rendering a revset() template once.
+        """
+
+        def literal(rev):
+            # a template string, in which braces are also escaped
+            escaped = rev.replace('\\', '\\\\').replace("'", "\\'")
+            return "'{}'".format(escaped.replace('{', '\\{'))
+
+        template = ''.join(
+            "{revset(r'%s', " + literal(rev) + ") % '{node}'}\\n" for rev in revs
+        )
+        return 'log', '-r', 'null', '--template', template
 
     def commit_tree(self, spec, message: str = 'committed'):
+        import jaraco.path
+
         jaraco.path.build(spec)
         self._invoke('addremove')
         self._invoke('commit', '-m', message)
@@ -167,6 +426,7 @@ class Mercurial(Command):
 
 class Git(Command):
     exe = 'git'
+    marker: str | None = '.git'
     version_pattern = r'git version (\d+\.\d+[^ ]*)'
 
     def is_valid(self):
@@ -182,88 +442,208 @@ class Git(Command):
         all_files = self._invoke('ls-files').splitlines()
         return all_files
 
+    def iter_files(self, decode=True):
+        """
+        Like find_files, but stream the names as the command emits them,
+        as str (or bytes if not decode).
+        """
+        return self._iter_records('ls-files', '-z', decode=decode)
+
     def get_tags(self, rev=None):
         """
         Return the tags for the current revision as a set
         """
-        rev = rev or 'HEAD'
-        return set(self._invoke('tag', '--points-at', rev).splitlines())
+        return self.ref_snapshot().tags_at(self._resolve_rev(rev))
+
+    _repo_tags_cmd = (
+        "for-each-ref",
+        "--format=%(refname:short) %(objectname:short)"
+        " %(committerdate:unix) %(*committerdate:unix)",
+        "refs/tags",
+    )
+
+    @staticmethod
+    def _parse_repo_tags(output):
+        """
+        Parse the output of _repo_tags_cmd, ordering the tags most
+        recently committed first (dating an annotated tag by the commit
+        it points at), as in refs.Snapshot.
+        """
+
+        def newest_first(line):
+            _, _, *dates = line.split(' ')
+            return -int(next(filter(None, dates), 0))
+
+        lines = sorted(filter(None, output.splitlines()), key=newest_first)
+        return (TaggedRevision(*line.split(' ')[:2]) for line in lines)
 
     def get_repo_tags(self):
-        cmd = [
-            "for-each-ref",
-            "--sort=-committerdate",
-            "--format=%(refname:short) %(objectname:short)",
-            "refs/tags",
-        ]
+        tags = self.ref_snapshot().tags
+        return (TaggedRevision(ref.name, ref.short) for ref in tags)
 
-        lines = self._invoke(*cmd).splitlines()
-        return (TaggedRevision(*line.rsplit(None, 1)) for line in lines if line)
+    _snapshots: dict[tuple, tuple[tuple, refs.Snapshot]] = {}
+
+    def ref_snapshot(self):
+        """
+        Return a refs.Snapshot of the repo, shared by all instances for
+        the repo and loaded again only once the refs have changed.
+        """
+        git_dir = gitdir.locate(self.location)
+        if git_dir is None:
+            return self._load_snapshot()
+        key = os.path.realpath(git_dir), type(self)._load_snapshot
+        state = gitdir.refs_state(git_dir)
+        cached = self._snapshots.get(key)
+        if cached is None or cached[0] != state:
+            cached = self._snapshots[key] = state, self._load_snapshot()
+        return cached[1]
+
+    def _load_snapshot(self):
+        return refs.Snapshot.load(self)
+
+    def _resolve_rev(self, rev=None):
+        """
+        Resolve rev (HEAD by default) to a full object id, reading HEAD
+        from the refs directly where possible.
+        """
+        if rev is None:
+            git_dir = gitdir.locate(self.location)
+            head = git_dir and gitdir.Refs(git_dir).read('HEAD')
+            if head:
+                return head
+        return self._invoke('rev-parse', '--verify', rev or 'HEAD').strip()
+
+    def _working_revs(self):
+        # the tags of the working tree are those of HEAD regardless
+        return self._resolve_rev(), None, False
+
+    def _refs_state(self):
+        """
+        Return a token that changes whenever any ref changes.
+        """
+        git_dir = gitdir.locate(self.location)
+        return git_dir and gitdir.refs_state(git_dir)
 
     def is_modified(self):
         """
-        Is the current state modified? (currently stubbed assuming no)
+        Does the working tree differ from HEAD, ignoring untracked files?
+
+        Asked of git in one ``git diff``, which (unlike ``diff-index``)
+        compares the contents of files whose stat data alone differs.
         """
-        return False
+        return bool(self._invoke(*self._diff_cmd))
+
+    _diff_cmd = (
+        '-c',
+        'diff.autoRefreshIndex=true',
+        'diff',
+        '--no-ext-diff',
+        '--name-only',
+        'HEAD',
+        '--',
+    )
 
     def get_ancestral_tags(self, rev=None):
         """
         Like get_repo_tags, but only get those tags ancestral to the current
         changeset.
         """
-        rev = rev or 'HEAD'
-        matches = self._invoke('tags', '--merged', rev).splitlines()
-        return (rev for rev in self.get_repo_tags() if rev.tag in matches)
+        out = self._invoke(*self._ancestral_tags_cmd(rev))
+        return self._parse_repo_tags(out)
+
+    @classmethod
+    def _ancestral_tags_cmd(cls, rev=None):
+        *cmd, pattern = cls._repo_tags_cmd
+        return *cmd, '--merged', rev or 'HEAD', pattern
 
     def sub_paths(self):
-        lines = self._invoke('submodules', 'status').splitlines()
-        return (line.split()[1] for line in lines)
+        """
+        Return the paths of the checked-out submodules, found as the
+        gitlink entries in the index.
+        """
+        entries = self._iter_records('ls-files', '-z', '--stage')
+        paths = (
+            path
+            for info, _, path in (entry.partition('\t') for entry in entries)
+            if info.startswith('160000 ')
+        )
+        return [
+            path
+            for path in paths
+            if os.path.exists(os.path.join(self.location, path, '.git'))
+        ]
 
     def _get_timestamp_str(self, rev):
-        return self._invoke('log', '-1', '--format=%ai', rev)
+        return self._invoke(*self._timestamp_cmd(rev))
 
-    def age(self):
+    @staticmethod
+    def _timestamp_cmd(rev):
+        return 'log', '-1', '--format=%ai', rev
+
+    def get_timestamps(self, revs):
         """
-        >>> repo = getfixture('git_repo')
-        >>> repo.age()
-        datetime.timedelta(...)
+        Return a dict mapping each of revs to its (author) timestamp,
+        as for get_timestamp, from one ``git log --no-walk`` call (and
+        a ``rev-parse`` where several of revs name the same commit).
         """
-        proc = subprocess.Popen(
-            ['git', 'log', '--reverse', '--pretty=%ad', '--date', 'iso'],
-            stdout=subprocess.PIPE,
-            text=True,
-            encoding='utf-8',
+        revs = list(dict.fromkeys(map(str, revs)))
+        if not revs:
+            return {}
+        out = self._invoke(*self._timestamps_cmd(revs))
+        pairs = [line.split(' ', 1) for line in out.splitlines()]
+        dates = {oid: datetime.datetime.fromisoformat(date) for oid, date in pairs}
+        oids = [oid for oid, _ in pairs]
+        if len(oids) != len(revs):
+            # git shows each commit once
+            spec = (rev + '^{commit}' for rev in revs)
+            oids = self._invoke('rev-parse', *spec).split()
+        return {rev: dates[oid] for rev, oid in zip(revs, oids)}
+
+    @staticmethod
+    def _timestamps_cmd(revs):
+        return (
+            '-c',
+            'log.showSignature=false',
+            'log',
+            '--no-walk=unsorted',
+            '--format=%H %aI',
+            *revs,
+            '--',
         )
-        first_line = proc.stdout.readline().strip()
-        proc.terminate()
-        proc.wait()
-        proc.stdout.close()
-        return utc.now() - dateutil.parser.parse(first_line)
+
+    def _load_first_commit_date(self):
+        roots = self._invoke('rev-list', '--max-parents=0', 'HEAD').split()
+        return min(self.get_timestamps(roots).values())
 
     def commit_tree(self, spec, message: str = 'committed'):
+        import jaraco.path
+
         jaraco.path.build(spec)
         self._invoke('add', '.')
         self._invoke('commit', '-m', message)
 
+    _head_date_cmd = (
+        '-c',
+        'log.showSignature=false',
+        'log',
+        '-n',
+        '1',
+        'HEAD',
+        '--format=%cI',
+    )
+
     def head_date(self):
-        out = self._invoke(
-            '-c',
-            'log.showSignature=false',
-            'log',
-            '-n',
-            '1',
-            'HEAD',
-            '--format=%cI',
+        return datetime.datetime.fromisoformat(
+            self._invoke(*self._head_date_cmd).strip()
         )
-        return dateutil.parser.parse(out)
 
     def describe_version(self):
         """
         >>> repo = getfixture('git_repo')
         >>> _ = repo._invoke('tag', 'v1.0.0')
         >>> desc = repo.describe_version()
-        >>> list(vars(desc))
-        ['date', 'tag', 'distance', 'node', 'dirty']
+        >>> desc._fields
+        ('date', 'tag', 'distance', 'node', 'dirty')
         >>> desc.tag
         'v1.0.0'
         >>> desc.node
@@ -278,21 +658,76 @@ class Git(Command):
         1
         >>> desc.dirty
         False
+        >>> import jaraco.path
         >>> jaraco.path.build({'bar': {'baz': 'pending'}})
         >>> desc = repo.describe_version()
         >>> desc.distance
         1
         >>> desc.dirty
         True
+
+        The tag, distance, node and date come from a single git
+        invocation and are reused for as long as the refs are
+        unchanged, so that only the dirty state is determined anew,
+        by ``is_modified`` (one ``git diff``, costing about what
+        ``git describe --dirty`` spends on it).
         """
-        output = self._invoke(
-            'describe',
-            '--dirty',
-            '--tags',
-            '--long',
-            '--match',
-            '*[0-9]*',
+        state = self._refs_state()
+        if state is None or self._described is None or self._described[0] != state:
+            self._described = state, self._describe()
+        return self._described[1]._replace(dirty=self.is_modified())
+
+    _described = None
+
+    def _describe(self):
+        try:
+            desc = self._parse_describe_log(self._invoke(*self._describe_log_cmd))
+        except RuntimeError:
+            desc = None
+        if desc is None:
+            # git before 2.35 lacks %(describe:tags)
+            output = self._invoke(*self._describe_cmd)
+            desc = self._parse_describe(output, self.head_date())
+        return desc
+
+    _describe_log_cmd = (
+        *_head_date_cmd[:-1],
+        '--format=%cI%x00%h%x00%(describe:tags,match=*[0-9]*)',
+    )
+
+    @staticmethod
+    def _parse_describe_log(output):
+        """
+        Parse the output of _describe_log_cmd, returning None if git did
+        not expand the describe placeholder.
+        """
+        date, node, description = output.strip().split('\0')
+        if description.startswith('%(describe'):
+            return None
+        if not description:
+            raise RuntimeError("No names found, cannot describe anything.")
+        match = re.fullmatch(
+            r'(?P<tag>.*)-(?P<distance>\d+)-g(?P<node>[0-9a-f]+)', description
+        )
+        # a describe string without distance and node is an exact match
+        if match and node.startswith(match['node']):
+            tag, distance = match['tag'], int(match['distance'])
+        else:
+            tag, distance = description, 0
+        return Description(
+            datetime.datetime.fromisoformat(date), tag, distance, 'g' + node, False
         )
+
+    _describe_cmd = (
+        'describe',
+        '--tags',
+        '--long',
+        '--match',
+        '*[0-9]*',
+    )
+
+    @staticmethod
+    def _parse_describe(output, date):
         match = re.match(
             r'(?P<tag>.*?)-'
             r'(?P<distance>\d+)-'
@@ -300,7 +735,10 @@ class Git(Command):
             r'(-(?P<dirty>dirty))?',
             output,
         )
-        desc = types.SimpleNamespace(date=self.head_date(), **match.groupdict())
-        desc.distance = int(desc.distance)
-        desc.dirty = bool(desc.dirty)
-        return desc
+        return Description(
+            date,
+            match['tag'],
+            int(match['distance']),
+            match['node'],
+            bool(match['dirty']),
+        )
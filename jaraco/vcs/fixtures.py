@@ -1,6 +1,7 @@
 import pytest
 
 from .. import vcs
+from .scaffold import init_git, init_hg
 
 
 def _ensure_present(repo):
@@ -20,15 +21,11 @@ def temp_work_dir(tmp_path, monkeypatch):
 def hg_repo(temp_work_dir):
     repo = vcs.Mercurial()
     _ensure_present(repo)
-    repo._invoke('init', '.')
-    return repo
+    return init_hg(repo)
 
 
 @pytest.fixture
 def git_repo(temp_work_dir):
     repo = vcs.Git()
     _ensure_present(repo)
-    repo._invoke('init')
-    repo._invoke('config', 'user.email', 'vip@example.com')
-    repo._invoke('config', 'user.name', 'Important User')
-    return repo
+    return init_git(repo)
@@ -0,0 +1,1037 @@
+"""
+Helpers for reading the contents of a Git repository directory
+directly, without invoking the git executable.
+"""
+
+from __future__ import annotations
+
+import datetime
+import hashlib
+import mmap
+import os
+import re
+import stat
+import struct
+import typing
+import zlib
+
+
+def _find_dotgit(location):
+    path = os.path.abspath(location)
+    while True:
+        candidate = os.path.join(path, '.git')
+        if os.path.exists(candidate):
+            return candidate
+        parent = os.path.dirname(path)
+        if parent == path:
+            return None
+        path = parent
+
+
+def locate(location='.'):
+    """
+    Find the git directory for the working tree containing location,
+    or None if location is not in a git working tree.
+
+    Honors ``.git`` files as used by worktrees and submodules.
+    """
+    candidate = _find_dotgit(location)
+    if candidate is None or os.path.isdir(candidate):
+        return candidate
+    return _read_gitfile(candidate)
+
+
+def work_tree(location='.'):
+    """
+    Return the root of the working tree containing location, or None.
+    """
+    candidate = _find_dotgit(location)
+    return candidate and os.path.dirname(candidate)
+
+
+def _read_gitfile(path):
+    with open(path, encoding='utf-8') as file:
+        prefix, _, target = file.read().strip().partition(': ')
+    if prefix != 'gitdir':
+        return None
+    return os.path.normpath(os.path.join(os.path.dirname(path), target))
+
+
+def common_dir(git_dir):
+    """
+    Return the directory holding the shared refs and objects for git_dir
+    (which differs from git_dir for linked worktrees).
+    """
+    try:
+        with open(os.path.join(git_dir, 'commondir'), encoding='utf-8') as file:
+            target = file.read().strip()
+    except FileNotFoundError:
+        return git_dir
+    return os.path.normpath(os.path.join(git_dir, target))
+
+
+def _stat_key(path):
+    try:
+        stat = os.stat(path)
+    except FileNotFoundError:
+        return None
+    return stat.st_mtime_ns, stat.st_size, stat.st_ino
+
+
+def _walk_stats(root):
+    for dirpath, dirnames, filenames in os.walk(root):
+        dirnames.sort()
+        yield dirpath, _stat_key(dirpath)
+        for name in sorted(filenames):
+            path = os.path.join(dirpath, name)
+            yield path, _stat_key(path)
+
+
+def refs_state(git_dir):
+    """
+    Return a hashable token that changes whenever any ref (including
+    HEAD) in the repository at git_dir changes.
+    """
+    common = common_dir(git_dir)
+    return (
+        _stat_key(os.path.join(git_dir, 'HEAD')),
+        _stat_key(os.path.join(common, 'packed-refs')),
+        tuple(_walk_stats(os.path.join(common, 'refs'))),
+    )
+
+
+class Signature(typing.NamedTuple):
+    """
+    An author, committer, or tagger line from a commit or tag object.
+    """
+
+    name: str
+    email: str
+    timestamp: int
+    offset: str
+
+    @classmethod
+    def parse(cls, value):
+        """
+        >>> sig = Signature.parse('Jane Doe <jane@example.com> 1700000000 +0130')
+        >>> sig.email
+        'jane@example.com'
+        >>> sig.date.isoformat()
+        '2023-11-14T23:43:20+01:30'
+        """
+        person, _, rest = value.rpartition('> ')
+        name, _, email = person.partition(' <')
+        timestamp, _, offset = rest.partition(' ')
+        return cls(name, email, int(timestamp), offset)
+
+    @property
+    def tzinfo(self):
+        sign = -1 if self.offset.startswith('-') else 1
+        hours, minutes = int(self.offset[1:3]), int(self.offset[3:5])
+        delta = datetime.timedelta(hours=hours, minutes=minutes)
+        return datetime.timezone(sign * delta)
+
+    @property
+    def date(self):
+        return datetime.datetime.fromtimestamp(self.timestamp, self.tzinfo)
+
+    def iso(self):
+        """
+        Render the date as git does for ``%ai``.
+
+        >>> Signature.parse('A <a@b> 1700000000 -0500').iso()
+        '2023-11-14 17:13:20 -0500'
+        """
+        return self.date.strftime('%Y-%m-%d %H:%M:%S %z')
+
+
+def parse_headers(raw):
+    """
+    Parse the header section of a commit or tag object into a dict
+    mapping each header to a list of its values.
+
+    >>> headers = parse_headers(b'tree abc\\nparent 1\\nparent 2\\n\\nmsg\\n')
+    >>> headers['parent']
+    ['1', '2']
+    >>> 'msg' in headers
+    False
+    """
+    head, _, _ = raw.decode('utf-8', 'replace').partition('\n\n')
+    headers: dict[str, list[str]] = {}
+    key = ''
+    for line in head.splitlines():
+        if line.startswith(' ') and key:
+            # continuation of a multi-line header (e.g. gpgsig)
+            headers[key][-1] += '\n' + line[1:]
+            continue
+        key, _, value = line.partition(' ')
+        headers.setdefault(key, []).append(value)
+    return headers
+
+
+OBJECT_TYPES = {1: 'commit', 2: 'tree', 3: 'blob', 4: 'tag'}
+OFS_DELTA, REF_DELTA = 6, 7
+
+
+def _read_varint(data, pos):
+    """
+    Read a little-endian base-128 size as used in deltas.
+    """
+    result = shift = 0
+    while True:
+        byte = data[pos]
+        pos += 1
+        result |= (byte & 0x7F) << shift
+        shift += 7
+        if not byte & 0x80:
+            return result, pos
+
+
+def apply_delta(base, delta):
+    """
+    Apply a git delta to the base object data.
+    """
+    source_size, pos = _read_varint(delta, 0)
+    if source_size != len(base):
+        raise ValueError("Delta does not apply to base object")
+    target_size, pos = _read_varint(delta, pos)
+    result = bytearray()
+    while pos < len(delta):
+        op = delta[pos]
+        pos += 1
+        if op & 0x80:
+            offset = size = 0
+            for shift, bit in enumerate(range(4)):
+                if op & (1 << bit):
+                    offset |= delta[pos] << (8 * shift)
+                    pos += 1
+            for shift, bit in enumerate(range(4, 7)):
+                if op & (1 << bit):
+                    size |= delta[pos] << (8 * shift)
+                    pos += 1
+            result += base[offset : offset + (size or 0x10000)]
+        elif op:
+            result += delta[pos : pos + op]
+            pos += op
+        else:
+            raise ValueError("Invalid delta opcode 0")
+    if len(result) != target_size:
+        raise ValueError("Delta produced an object of unexpected size")
+    return bytes(result)
+
+
+class PackIndex:
+    """
+    A memory-mapped pack ``.idx`` file (version 1 or 2).
+    """
+
+    def __init__(self, path):
+        with open(path, 'rb') as file:
+            self.map = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+        if self.map[:4] == b'\xfftOc':
+            (self.version,) = struct.unpack('>I', self.map[4:8])
+            fanout_start = 8
+        else:
+            self.version = 1
+            fanout_start = 0
+        self.fanout = struct.unpack(
+            '>256I', self.map[fanout_start : fanout_start + 1024]
+        )
+        self.count = self.fanout[255]
+        names_start = fanout_start + 1024
+        if self.version == 1:
+            self._entry_size, self._name_start = 24, names_start + 4
+        else:
+            self._entry_size, self._name_start = 20, names_start
+            self._offsets_start = names_start + 24 * self.count
+            self._large_start = self._offsets_start + 4 * self.count
+
+    def close(self):
+        self.map.close()
+
+    def name(self, index):
+        pos = self._name_start + index * self._entry_size
+        return self.map[pos : pos + 20]
+
+    def _bounds(self, first):
+        return (self.fanout[first - 1] if first else 0), self.fanout[first]
+
+    def _bisect(self, prefix):
+        """
+        Return the index of the first name not less than prefix.
+        """
+        lo, hi = self._bounds(prefix[0])
+        while lo < hi:
+            mid = (lo + hi) // 2
+            if self.name(mid) < prefix:
+                lo = mid + 1
+            else:
+                hi = mid
+        return lo
+
+    def find(self, oid):
+        """
+        Return the pack offset of the object with binary id oid, or None.
+        """
+        index = self._bisect(oid)
+        if index < self.count and self.name(index) == oid:
+            return self.offset(index)
+        return None
+
+    def matching(self, prefix):
+        """
+        Yield the binary ids of objects whose hex id starts with prefix
+        (of at least two characters).
+        """
+        start = bytes.fromhex(prefix.ljust(len(prefix) + len(prefix) % 2, '0'))
+        _, hi = self._bounds(start[0])
+        index = self._bisect(start)
+        while index < hi and self.name(index).hex().startswith(prefix):
+            yield self.name(index)
+            index += 1
+
+    def offset(self, index):
+        if self.version == 1:
+            pos = self._name_start - 4 + index * self._entry_size
+            return struct.unpack('>I', self.map[pos : pos + 4])[0]
+        pos = self._offsets_start + 4 * index
+        (offset,) = struct.unpack('>I', self.map[pos : pos + 4])
+        if offset & 0x80000000:
+            pos = self._large_start + 8 * (offset & 0x7FFFFFFF)
+            (offset,) = struct.unpack('>Q', self.map[pos : pos + 8])
+        return offset
+
+
+class Pack:
+    """
+    A memory-mapped packfile and its index.
+    """
+
+    chunk_size = 64 * 1024
+
+    def __init__(self, path):
+        self.path = path
+        self.index = PackIndex(path[: -len('.pack')] + '.idx')
+        with open(path, 'rb') as file:
+            self.map = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+
+    def close(self):
+        self.index.close()
+        self.map.close()
+
+    def _inflate(self, pos):
+        decompressor = zlib.decompressobj()
+        chunks = []
+        while not decompressor.eof:
+            chunk = self.map[pos : pos + self.chunk_size]
+            if not chunk:
+                raise ValueError("Truncated pack")
+            chunks.append(decompressor.decompress(chunk))
+            pos += self.chunk_size
+        return b''.join(chunks)
+
+    def read_at(self, offset, store):
+        """
+        Return the type and data of the object at offset, resolving
+        deltas (against objects in store for ref-deltas).
+        """
+        byte = self.map[offset]
+        pos = offset + 1
+        type_num = (byte >> 4) & 7
+        shift = 4
+        while byte & 0x80:
+            byte = self.map[pos]
+            pos += 1
+            shift += 7
+        if type_num == OFS_DELTA:
+            byte = self.map[pos]
+            pos += 1
+            distance = byte & 0x7F
+            while byte & 0x80:
+                byte = self.map[pos]
+                pos += 1
+                distance = ((distance + 1) << 7) | (byte & 0x7F)
+            type, base = self.read_at(offset - distance, store)
+            return type, apply_delta(base, self._inflate(pos))
+        if type_num == REF_DELTA:
+            base_oid = self.map[pos : pos + 20].hex()
+            type, base = store.read(base_oid)
+            return type, apply_delta(base, self._inflate(pos + 20))
+        return OBJECT_TYPES[type_num], self._inflate(pos)
+
+
+class ObjectStore:
+    """
+    Read access to the loose and packed objects of a repository.
+    """
+
+    def __init__(self, objects_dir):
+        self.dirs = [objects_dir, *self._alternates(objects_dir)]
+        self._packs = None
+
+    @staticmethod
+    def _alternates(objects_dir):
+        try:
+            with open(
+                os.path.join(objects_dir, 'info', 'alternates'), encoding='utf-8'
+            ) as file:
+                lines = file.read().splitlines()
+        except FileNotFoundError:
+            return []
+        return [
+            os.path.normpath(os.path.join(objects_dir, line))
+            for line in lines
+            if line and not line.startswith('#')
+        ]
+
+    def _pack_paths(self):
+        return [
+            os.path.join(pack_dir, name)
+            for pack_dir in (os.path.join(dir, 'pack') for dir in self.dirs)
+            if os.path.isdir(pack_dir)
+            for name in sorted(os.listdir(pack_dir))
+            if name.endswith('.pack')
+        ]
+
+    @property
+    def packs(self):
+        if self._packs is None:
+            self._packs = list(map(Pack, self._pack_paths()))
+        return self._packs
+
+    def reprepare(self):
+        """
+        Rescan the pack directories for packs added or removed since
+        they were read (e.g. by a ``git gc``), as git's
+        ``reprepare_packed_git`` does. Return whether any were.
+        """
+        paths = self._pack_paths()
+        loaded = {pack.path: pack for pack in self._packs or ()}
+        if self._packs is not None and list(loaded) == paths:
+            return False
+        for path in loaded.keys() - set(paths):
+            loaded[path].close()
+        self._packs = [loaded.get(path) or Pack(path) for path in paths]
+        return True
+
+    def close(self):
+        for pack in self._packs or ():
+            pack.close()
+        self._packs = None
+
+    def _loose_path(self, dir, oid):
+        return os.path.join(dir, oid[:2], oid[2:])
+
+    def read(self, oid):
+        """
+        Return the type and data of the object with the hex id oid,
+        rescanning the packs once if it is not found.
+        """
+        try:
+            return self._read(oid)
+        except KeyError:
+            if not self.reprepare():
+                raise
+        return self._read(oid)
+
+    def _read(self, oid):
+        for dir in self.dirs:
+            try:
+                with open(self._loose_path(dir, oid), 'rb') as file:
+                    raw = zlib.decompress(file.read())
+            except FileNotFoundError:
+                continue
+            header, _, data = raw.partition(b'\0')
+            type, _, _ = header.decode('ascii').partition(' ')
+            return type, data
+        binary = bytes.fromhex(oid)
+        for pack in self.packs:
+            offset = pack.index.find(binary)
+            if offset is not None:
+                return pack.read_at(offset, self)
+        raise KeyError(oid)
+
+    def __contains__(self, oid):
+        try:
+            binary = bytes.fromhex(oid)
+        except ValueError:
+            return False
+        return self._contains(oid, binary) or (
+            self.reprepare() and self._contains(oid, binary)
+        )
+
+    def _contains(self, oid, binary):
+        return any(
+            os.path.exists(self._loose_path(dir, oid)) for dir in self.dirs
+        ) or any(pack.index.find(binary) is not None for pack in self.packs)
+
+    def matching(self, prefix):
+        """
+        Return the set of hex ids of objects starting with prefix.
+        """
+        prefix = prefix.lower()
+        loose = {
+            prefix[:2] + name
+            for dir in self.dirs
+            if os.path.isdir(os.path.join(dir, prefix[:2]))
+            for name in os.listdir(os.path.join(dir, prefix[:2]))
+            if name.startswith(prefix[2:])
+        }
+        packed = {
+            name.hex() for pack in self.packs for name in pack.index.matching(prefix)
+        }
+        return loose | packed
+
+    def approximate_count(self):
+        packed = sum(pack.index.count for pack in self.packs)
+        loose_dir = os.path.join(self.dirs[0], '17')
+        loose = len(os.listdir(loose_dir)) * 256 if os.path.isdir(loose_dir) else 0
+        return packed + loose
+
+    def abbreviate(self, oid):
+        """
+        Abbreviate oid the way git does by default: at least seven
+        characters (more in large repos), extended until unique.
+        """
+        length = max(7, (self.approximate_count().bit_length() + 1) // 2)
+        while length < len(oid) and len(self.matching(oid[:length])) > 1:
+            length += 1
+        return oid[:length]
+
+
+class Refs:
+    """
+    Read access to the loose and packed refs of a repository.
+    """
+
+    oid_pattern = '[0-9a-f]{40}|[0-9a-f]{64}'
+
+    def __init__(self, git_dir):
+        self.git_dir = git_dir
+        self.common_dir = common_dir(git_dir)
+
+    def _ref_path(self, name):
+        base = self.git_dir if '/' not in name else self.common_dir
+        return os.path.join(base, *name.split('/'))
+
+    def packed(self):
+        """
+        Return a dict mapping ref names to their (oid, peeled oid) from
+        packed-refs. The peeled oid is None if not recorded.
+        """
+        refs = {}
+        try:
+            with open(
+                os.path.join(self.common_dir, 'packed-refs'), encoding='utf-8'
+            ) as file:
+                lines = file.read().splitlines()
+        except FileNotFoundError:
+            return refs
+        name = None
+        for line in lines:
+            if line.startswith('#') or not line:
+                continue
+            if line.startswith('^'):
+                refs[name] = refs[name][0], line[1:]
+                continue
+            oid, _, name = line.partition(' ')
+            refs[name] = oid, None
+        return refs
+
+    def _loose(self, prefix):
+        root = self._ref_path(prefix.rstrip('/'))
+        for dirpath, dirnames, filenames in os.walk(root):
+            for filename in filenames:
+                path = os.path.join(dirpath, filename)
+                name = os.path.relpath(path, self.common_dir).replace(os.sep, '/')
+                yield name
+
+    def read(self, name):
+        """
+        Return the oid that name resolves to, following symbolic refs,
+        or None if the ref does not exist or is not a ref.
+        """
+        for _ in range(10):
+            try:
+                with open(
+                    self._ref_path(name), encoding='utf-8', errors='replace'
+                ) as file:
+                    content = file.read().strip()
+            except (FileNotFoundError, IsADirectoryError, NotADirectoryError):
+                oid, _ = self.packed().get(name, (None, None))
+                return oid
+            if not content.startswith('ref: '):
+                return content if re.fullmatch(self.oid_pattern, content) else None
+            name = content[len('ref: ') :]
+        raise ValueError(f"Symbolic ref loop at {name}")
+
+    def list(self, prefix='refs/'):
+        """
+        Return a dict mapping names of refs under prefix to (oid, peeled)
+        where peeled is known only for packed refs.
+        """
+        packed = self.packed()
+        refs = {
+            name: value for name, value in packed.items() if name.startswith(prefix)
+        }
+        for name in self._loose(prefix):
+            oid = self.read(name)
+            if oid:
+                refs[name] = oid, None
+        return refs
+
+
+class Repository:
+    """
+    A read-only view of a git repository directory.
+    """
+
+    search_paths = (
+        '{}',
+        'refs/{}',
+        'refs/tags/{}',
+        'refs/heads/{}',
+        'refs/remotes/{}',
+        'refs/remotes/{}/HEAD',
+    )
+    suffix_pattern = re.compile(r'\^\{(?P<type>\w*)\}|(?P<op>[~^])(?P<num>\d*)')
+
+    def __init__(self, git_dir):
+        self.git_dir = git_dir
+        self.refs = Refs(git_dir)
+        self.objects = ObjectStore(os.path.join(self.refs.common_dir, 'objects'))
+
+    @classmethod
+    def discover(cls, location='.'):
+        git_dir = locate(location)
+        if git_dir is None:
+            raise ValueError(f"{location} is not in a git working tree")
+        return cls(git_dir)
+
+    def close(self):
+        self.objects.close()
+
+    def read(self, oid):
+        return self.objects.read(oid)
+
+    def headers(self, oid):
+        return parse_headers(self.read(oid)[1])
+
+    def peel(self, oid, type='commit'):
+        """
+        Dereference tags until reaching an object of type (or any
+        non-tag object if type is empty).
+        """
+        kind, data = self.read(oid)
+        while kind == 'tag' and kind != type:
+            (oid,) = parse_headers(data)['object']
+            kind, data = self.read(oid)
+        if type and kind != type:
+            raise ValueError(f"{oid} is a {kind}, not a {type}")
+        return oid
+
+    def _resolve_name(self, name):
+        for template in self.search_paths:
+            ref = template.format(name)
+            if '/' not in ref and not re.fullmatch('[A-Z_]+', ref):
+                # as for git, only pseudorefs live at the top level
+                continue
+            oid = self.refs.read(ref)
+            if oid:
+                return oid
+        if re.fullmatch(r'[0-9a-fA-F]{4,40}', name):
+            matches = self.objects.matching(name)
+            if len(matches) == 1:
+                return matches.pop()
+            if matches:
+                raise ValueError(f"short object ID {name} is ambiguous")
+        raise ValueError(f"unknown revision {name!r}")
+
+    def resolve(self, rev='HEAD'):
+        """
+        Resolve a revision (a ref name or hex id, optionally followed by
+        ``^``, ``^N``, ``~N`` or ``^{type}`` suffixes) to a hex object id.
+        """
+        match = re.match(r'(.*?)((?:\^\{\w*\}|[~^]\d*)*)$', rev)
+        name, suffixes = match.groups()
+        oid = self._resolve_name(name or 'HEAD')
+        for suffix in self.suffix_pattern.finditer(suffixes):
+            if suffix['op'] is None:
+                oid = self.peel(oid, suffix['type'])
+                continue
+            num = int(suffix['num'] or 1)
+            if suffix['op'] == '^' and num == 0:
+                oid = self.peel(oid)
+                continue
+            for _ in range(1 if suffix['op'] == '^' else num):
+                parents = self.headers(self.peel(oid)).get('parent', [])
+                index = num - 1 if suffix['op'] == '^' else 0
+                if index >= len(parents):
+                    raise ValueError(f"unknown revision {rev!r}")
+                oid = parents[index]
+        return oid
+
+
+ASSUME_VALID = 0x8000
+SKIP_WORKTREE = 0x4000
+INTENT_TO_ADD = 0x2000
+"""
+Flags of index entries, the last two among the extended flags.
+"""
+
+
+class IndexEntry(typing.NamedTuple):
+    path: bytes
+    mode: int
+    oid: str
+    size: int
+    mtime_ns: int
+    ino: int
+    flags: int
+    extended_flags: int
+
+    @property
+    def stage(self):
+        return (self.flags >> 12) & 3
+
+    @property
+    def unchanged(self):
+        """
+        Is the entry flagged to be treated as matching the working tree?
+        """
+        return bool(self.flags & ASSUME_VALID or self.extended_flags & SKIP_WORKTREE)
+
+
+class Index:
+    """
+    A parsed ``.git/index`` file (versions 2 through 4, SHA-1 only).
+
+    Entries are parsed lazily on iteration; the extensions following
+    them are available once iteration is complete.
+    """
+
+    entry_format = struct.Struct('>8xII4xII8xI20sH')
+
+    def __init__(self, data):
+        if data[:4] != b'DIRC':
+            raise ValueError("Not a git index")
+        self.data = data
+        self.version, self.count = struct.unpack_from('>II', data, 4)
+        if self.version not in (2, 3, 4):
+            raise ValueError(f"Unsupported index version {self.version}")
+        self.extensions = None
+
+    @classmethod
+    def read(cls, path):
+        with open(path, 'rb') as file:
+            return cls(file.read())
+
+    @staticmethod
+    def _read_offset(data, pos):
+        """
+        Read the base-128 offset varint used for v4 path compression.
+        """
+        byte = data[pos]
+        pos += 1
+        value = byte & 0x7F
+        while byte & 0x80:
+            byte = data[pos]
+            pos += 1
+            value = ((value + 1) << 7) | (byte & 0x7F)
+        return value, pos
+
+    def __iter__(self):
+        data, pos, path = self.data, 12, b''
+        for _ in range(self.count):
+            start = pos
+            mtime, mtime_ns, ino, mode, size, oid, flags = (
+                self.entry_format.unpack_from(data, pos)
+            )
+            pos += self.entry_format.size
+            extended = 0
+            if flags & 0x4000:
+                (extended,) = struct.unpack_from('>H', data, pos)
+                pos += 2
+            if self.version == 4:
+                strip, pos = self._read_offset(data, pos)
+                end = data.index(b'\0', pos)
+                path = path[: len(path) - strip] + data[pos:end]
+                pos = end + 1
+            else:
+                end = data.index(b'\0', pos)
+                path = data[pos:end]
+                pos = start + (end - start + 8) // 8 * 8
+            yield IndexEntry(
+                path,
+                mode,
+                oid.hex(),
+                size,
+                mtime * 1_000_000_000 + mtime_ns,
+                ino,
+                flags,
+                extended,
+            )
+        self.extensions = dict(self._extensions(pos))
+
+    def _extensions(self, pos):
+        end = len(self.data) - 20
+        while pos + 8 <= end:
+            signature = self.data[pos : pos + 4]
+            (size,) = struct.unpack_from('>I', self.data, pos + 4)
+            yield signature, self.data[pos + 8 : pos + 8 + size]
+            pos += 8 + size
+
+    def cached_tree(self):
+        """
+        Return the id of the tree the cache-tree extension records for
+        the index, or None if it is absent or invalidated.
+        """
+        data = (self.extensions or {}).get(b'TREE')
+        if not data:
+            return None
+        # the root entry: path, NUL, entry count, space, subtrees, newline
+        end = data.index(b'\n')
+        count = int(data[data.index(b'\0') + 1 : end].split()[0])
+        return data[end + 1 : end + 21].hex() if count >= 0 else None
+
+
+GITLINK = 0o160000
+"""
+The mode of submodule entries in trees and the index.
+"""
+
+
+def blob_id(data):
+    """
+    Return the hex id git assigns to a blob with contents data.
+
+    >>> blob_id(b'')
+    'e69de29bb2d1d6434b8b29ae775ad8c2e48c5391'
+    """
+    return hashlib.sha1(b'blob %d\0' % len(data) + data).hexdigest()
+
+
+def _mode_kind(mode, filemode=True):
+    executable = filemode and stat.S_ISREG(mode) and mode & 0o100
+    return stat.S_IFMT(mode), bool(executable)
+
+
+def _config_paths(git_dir):
+    """
+    Return the paths of the config files git reads for git_dir, from
+    the system config to the worktree config.
+    """
+    home = os.path.expanduser('~')
+    xdg = os.environ.get('XDG_CONFIG_HOME') or os.path.join(home, '.config')
+    return [
+        os.environ.get('GIT_CONFIG_SYSTEM', '/etc/gitconfig'),
+        '/usr/local/etc/gitconfig',
+        os.environ.get('GIT_CONFIG_GLOBAL', os.path.join(home, '.gitconfig')),
+        os.path.join(xdg, 'git', 'config'),
+        os.path.join(common_dir(git_dir), 'config'),
+        os.path.join(git_dir, 'config.worktree'),
+    ]
+
+
+def _read_core(path):
+    """
+    Yield the (lowercased) names and values of the ``core`` settings
+    in the git config file at path. A name without a value is true.
+    """
+    try:
+        with open(path, encoding='utf-8', errors='replace') as file:
+            lines = file.read().lower().splitlines()
+    except OSError:
+        return
+    section = None
+    for line in lines:
+        line = re.split('[#;]', line)[0].strip()
+        if line.startswith('['):
+            section = line[1:].partition(']')[0].strip()
+            continue
+        if section == 'core' and line:
+            name, sep, value = line.partition('=')
+            yield name.strip(), value.strip() if sep else 'true'
+
+
+class _CoreConfig(typing.NamedTuple):
+    """
+    The ``core`` settings affecting how the working tree is compared
+    against the index.
+    """
+
+    filemode: bool = True
+    """Is the executable bit of files tracked?"""
+    symlinks: bool = True
+    """Are symbolic links checked out as links (else as plain files)?"""
+
+    @classmethod
+    def read(cls, git_dir):
+        settings = {}
+        for path in _config_paths(git_dir):
+            settings.update(_read_core(path))
+        return cls(
+            *(
+                settings.get(name, 'true') not in ('false', 'no', 'off', '0')
+                for name in cls._fields
+            )
+        )
+
+
+def _config_may_filter(path):
+    """
+    Might the git config file at path enable line ending conversion,
+    name an attributes file or include other files?
+    """
+    try:
+        with open(path, encoding='utf-8', errors='replace') as file:
+            lines = file.read().lower().splitlines()
+    except OSError:
+        return False
+    for line in lines:
+        name, _, value = line.partition('=')
+        name, value = name.strip(), re.split('[#;]', value)[0].strip()
+        if name == 'autocrlf' and value not in ('false', 'no', 'off', '0'):
+            return True
+        if name == 'attributesfile' or name.startswith('[include'):
+            return True
+    return False
+
+
+def _may_filter(git_dir, root, path):
+    """
+    Might git apply content filters (line ending conversion or those
+    selected by attributes) to the file at path, relative to root?
+
+    Git for Windows enables ``core.autocrlf`` in a system config whose
+    location is not known here, so filters are assumed there.
+    """
+    if os.name == 'nt' or {'GIT_CONFIG_PARAMETERS', 'GIT_CONFIG_COUNT'} & set(
+        os.environ
+    ):
+        return True
+    common = common_dir(git_dir)
+    home = os.path.expanduser('~')
+    xdg = os.environ.get('XDG_CONFIG_HOME') or os.path.join(home, '.config')
+    parts = os.fsdecode(path).split('/')[:-1]
+    attributes = [
+        '/etc/gitattributes',
+        '/usr/local/etc/gitattributes',
+        os.path.join(xdg, 'git', 'attributes'),
+        os.path.join(common, 'info', 'attributes'),
+        *(
+            os.path.join(root, *parts[:depth], '.gitattributes')
+            for depth in range(len(parts) + 1)
+        ),
+    ]
+    return any(map(_config_may_filter, _config_paths(git_dir))) or any(
+        map(os.path.exists, attributes)
+    )
+
+
+def _entry_status(entry, git_dir, root, racy_ns, core):
+    """
+    Compare an index entry against the working tree at root (as bytes
+    ending in a separator), as configured by core (a ``_CoreConfig``). Return False if it matches, True if it
+    certainly differs, or None if its contents differ as read, which
+    may not hold once git applies its filters.
+    """
+    path = root + entry.path
+    try:
+        info = os.lstat(path)
+    except (FileNotFoundError, NotADirectoryError):
+        return True
+    mode = info.st_mode
+    if stat.S_ISLNK(entry.mode) and stat.S_ISREG(mode) and not core.symlinks:
+        # checked out as a plain file holding the target
+        mode = entry.mode
+    if _mode_kind(mode, core.filemode) != _mode_kind(entry.mode, core.filemode):
+        return True
+    if (
+        info.st_size & 0xFFFFFFFF == entry.size
+        and info.st_mtime_ns == entry.mtime_ns
+        and (not entry.ino or info.st_ino & 0xFFFFFFFF == entry.ino)
+        and entry.mtime_ns < racy_ns
+    ):
+        return False
+    if stat.S_ISLNK(info.st_mode):
+        data = os.fsencode(os.readlink(path))
+    else:
+        with open(path, 'rb') as file:
+            data = file.read()
+    if blob_id(data) == entry.oid:
+        return False
+    return None if _may_filter(git_dir, os.fsdecode(root), entry.path) else True
+
+
+def _read_index(git_dir):
+    """
+    Return the index of git_dir (or None if there is none) and its mtime
+    in nanoseconds, against which entries are checked for racy stat data.
+    """
+    path = os.path.join(git_dir, 'index')
+    try:
+        return Index.read(path), os.stat(path).st_mtime_ns
+    except FileNotFoundError:
+        return None, 0
+
+
+def is_modified(location='.'):
+    """
+    Does the working tree containing location differ from HEAD,
+    ignoring untracked files?
+
+    The index is read directly and the stat data of each tracked file
+    compared against it, only reading files whose stat data differs,
+    and stopping at the first difference. The index is then compared
+    against HEAD through the tree its cache-tree extension records.
+    Returns None where this cannot decide: when a file's contents
+    differ but git's content filters (e.g. line ending conversion) are
+    configured and might account for that, when the cache-tree has
+    been invalidated (as by ``git add``), or when the index uses a
+    format not supported here.
+    """
+    git_dir = locate(location)
+    if git_dir is None:
+        return None
+    root = os.path.join(os.fsencode(work_tree(location)), b'')
+    try:
+        index, racy_ns = _read_index(git_dir)
+    except ValueError:
+        return None
+    core = _CoreConfig.read(git_dir)
+    undecided = False
+    for entry in index or ():
+        if entry.stage or entry.extended_flags & INTENT_TO_ADD:
+            return True
+        if stat.S_ISDIR(entry.mode):
+            # sparse index
+            return None
+        if stat.S_IFMT(entry.mode) == GITLINK or entry.unchanged:
+            continue
+        status = _entry_status(entry, git_dir, root, racy_ns, core)
+        if status:
+            return True
+        undecided |= status is None
+    if index and b'link' in index.extensions:
+        # split index
+        return None
+    head_differs = _head_differs(git_dir, index)
+    return None if undecided and not head_differs else head_differs
+
+
+def _head_differs(git_dir, index):
+    """
+    Does the tree of HEAD differ from the index? Return None if the
+    index records no tree to compare against.
+    """
+    repository = Repository(git_dir)
+    try:
+        try:
+            (head,) = repository.headers(repository.resolve('HEAD^{commit}'))['tree']
+        except ValueError:
+            return bool(index and index.count)
+        tree = index and index.cached_tree()
+        return tree and tree != head
+    finally:
+        repository.close()
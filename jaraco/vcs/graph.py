@@ -0,0 +1,465 @@
+"""
+An in-memory graph of the commits of a git repo, answering ancestry
+and distance queries without running git.
+
+The graph is read from git's commit-graph file (or chain) if the repo
+has one, and otherwise from a single ``git rev-list`` of the history.
+Commits made since are read from the object store as queries reach
+them. Each commit carries its generation number (topological level),
+one more than the greatest of its parents', so a walk looking for an
+ancestor can stop at commits of lower generation.
+
+>>> repo = getfixture('git_repo')
+>>> repo.commit_tree({'bar': {'baz': 'changed'}})
+>>> graph = Graph.load(repo)
+>>> head = repo._resolve_rev()
+>>> graph.generation(head)
+3
+>>> graph.is_ancestor(graph.parents(head)[0], head)
+True
+>>> graph.count(head)
+3
+>>> graph.close()
+"""
+
+from __future__ import annotations
+
+import fnmatch
+import heapq
+import os
+import struct
+from collections.abc import Iterable, Mapping, Sequence
+
+from . import cmd, gitdir
+
+PARENT_NONE = 0x70000000
+EXTRA_EDGES = 0x80000000
+
+
+class Graph:
+    """
+    Commits, their parents and their generation numbers, stored by
+    position in flat lists and indexed by object id.
+    """
+
+    def __init__(self, repository=None):
+        self.repository = repository
+        self.oids: list[str] = []
+        self.index: dict[str, int] = {}
+        self._parents: list[tuple[int, ...]] = []
+        self._generations: list[int] = []
+
+    def __len__(self):
+        return len(self.oids)
+
+    def close(self):
+        if self.repository is not None:
+            self.repository.close()
+
+    @classmethod
+    def load(cls, repo):
+        """
+        Load the graph of the git repo from its commit-graph or, if
+        it has none, with ``git rev-list``.
+        """
+        repository = gitdir.Repository.discover(repo.location)
+        objects_dir = repository.objects.dirs[0]
+        return cls.read(objects_dir, repository) or cls.from_rev_list(repo, repository)
+
+    @classmethod
+    def read(cls, objects_dir, repository=None):
+        """
+        Read the commit-graph file or chain in objects_dir, or return
+        None if there is neither.
+        """
+        info = os.path.join(objects_dir, 'info')
+        chain = os.path.join(info, 'commit-graphs', 'commit-graph-chain')
+        if os.path.exists(os.path.join(info, 'commit-graph')):
+            paths = [os.path.join(info, 'commit-graph')]
+        elif os.path.exists(chain):
+            with open(chain, encoding='ascii') as file:
+                paths = [
+                    os.path.join(info, 'commit-graphs', f'graph-{digest}.graph')
+                    for digest in file.read().split()
+                ]
+        else:
+            return None
+        graph = cls(repository)
+        for path in paths:
+            with open(path, 'rb') as file:
+                graph._read_layer(file.read())
+        return graph
+
+    _rev_list_cmd = (
+        'rev-list',
+        '--parents',
+        '--topo-order',
+        '--reverse',
+        '--all',
+        'HEAD',
+    )
+
+    @classmethod
+    def from_rev_list(cls, repo, repository=None):
+        """
+        Load the commits reachable from any ref (or HEAD) with one
+        ``git rev-list``, listing parents before their children.
+        """
+        graph = cls(repository)
+        try:
+            output = repo._invoke(*cls._rev_list_cmd)
+        except RuntimeError:
+            # no commits yet
+            return graph
+        for line in output.splitlines():
+            oid, *parents = line.split()
+            graph.add(oid, parents)
+        return graph
+
+    def _read_layer(self, data):
+        """
+        Append the commits of a commit-graph file, whose parents are
+        identified by their position in this and any preceding layers.
+        """
+        signature, version, hash_version, chunk_count = struct.unpack_from(
+            '>4sBBB', data
+        )
+        if signature != b'CGPH' or version != 1:
+            raise ValueError("Unsupported commit-graph")
+        hash_len = {1: 20, 2: 32}[hash_version]
+        chunks = dict(struct.iter_unpack('>4sQ', data[8 : 8 + 12 * (chunk_count + 1)]))
+        (count,) = struct.unpack_from('>I', data, chunks[b'OIDF'] + 255 * 4)
+        start = chunks[b'OIDL']
+        oids = [
+            data[pos : pos + hash_len].hex()
+            for pos in range(start, start + count * hash_len, hash_len)
+        ]
+        record = struct.Struct(f'>{hash_len}xIII4x')
+        offset = len(self.oids)
+        generations = []
+        for pos, oid in enumerate(oids, offset):
+            first, second, generation = record.unpack_from(
+                data, chunks[b'CDAT'] + (pos - offset) * record.size
+            )
+            self.index[oid] = pos
+            self._parents.append(self._layer_parents(data, chunks, first, second))
+            generations.append(generation >> 2)
+        self.oids.extend(oids)
+        self._generations.extend(generations)
+        if not all(generations):
+            # written without generation numbers
+            self._compute_generations(offset)
+
+    @staticmethod
+    def _layer_parents(data, chunks, first, second):
+        if first == PARENT_NONE:
+            return ()
+        if second == PARENT_NONE:
+            return (first,)
+        if not second & EXTRA_EDGES:
+            return first, second
+        parents = [first]
+        pos = chunks[b'EDGE'] + 4 * (second & ~EXTRA_EDGES)
+        while True:
+            (edge,) = struct.unpack_from('>I', data, pos)
+            parents.append(edge & ~EXTRA_EDGES)
+            if edge & EXTRA_EDGES:
+                return tuple(parents)
+            pos += 4
+
+    def _compute_generations(self, start):
+        for pos in range(start, len(self.oids)):
+            self._generations[pos] = 0
+        for pos in range(start, len(self.oids)):
+            stack = [pos]
+            while stack:
+                current = stack[-1]
+                if self._generations[current]:
+                    stack.pop()
+                    continue
+                pending = [
+                    p for p in self._parents[current] if not self._generations[p]
+                ]
+                if pending:
+                    stack.extend(pending)
+                    continue
+                stack.pop()
+                self._generations[current] = 1 + max(
+                    (self._generations[p] for p in self._parents[current]), default=0
+                )
+
+    def add(self, oid, parents: Sequence[str]):
+        """
+        Add commit oid, whose parents are already in the graph.
+        """
+        positions = tuple(self.index[parent] for parent in parents)
+        generation = 1 + max((self._generations[p] for p in positions), default=0)
+        pos = self.index[oid] = len(self.oids)
+        self.oids.append(oid)
+        self._parents.append(positions)
+        self._generations.append(generation)
+        return pos
+
+    def _position(self, oid):
+        try:
+            return self.index[oid]
+        except KeyError:
+            return self._load(oid)
+
+    def _load(self, oid):
+        """
+        Add commit oid and any of its ancestors not yet in the graph,
+        reading them from the object store. Raise ValueError if oid is
+        not a commit or is missing.
+        """
+        if self.repository is None:
+            raise ValueError(f"{oid} is not in the commit graph")
+        stack = [oid]
+        parents: dict[str, list[str]] = {}
+        while stack:
+            current = stack[-1]
+            if current in self.index:
+                stack.pop()
+                continue
+            if current not in parents:
+                try:
+                    kind, data = self.repository.read(current)
+                except KeyError:
+                    raise ValueError(f"{current} is not in the repository") from None
+                if kind != 'commit':
+                    raise ValueError(f"{current} is a {kind}, not a commit")
+                parents[current] = gitdir.parse_headers(data).get('parent', [])
+            pending = [
+                parent for parent in parents[current] if parent not in self.index
+            ]
+            if pending:
+                stack.extend(pending)
+                continue
+            stack.pop()
+            self.add(current, parents[current])
+        return self.index[oid]
+
+    def parents(self, oid):
+        return [self.oids[pos] for pos in self._parents[self._position(oid)]]
+
+    def generation(self, oid):
+        return self._generations[self._position(oid)]
+
+    def _walk(self, start, floor=0):
+        """
+        Generate the positions of the ancestors of start (inclusive)
+        in order of descending generation, omitting those below floor.
+        """
+        seen = {start}
+        heap = [(-self._generations[start], start)]
+        while heap:
+            _, pos = heapq.heappop(heap)
+            yield pos
+            for parent in self._parents[pos]:
+                if parent not in seen and self._generations[parent] >= floor:
+                    seen.add(parent)
+                    heapq.heappush(heap, (-self._generations[parent], parent))
+
+    def is_ancestor(self, ancestor, rev):
+        """
+        Is commit ancestor reachable from commit rev (or rev itself)?
+        """
+        target = self._position(ancestor)
+        floor = self._generations[target]
+        return target in self._walk(self._position(rev), floor)
+
+    def reachable(self, rev, oids: Iterable[str]):
+        """
+        Return the set of oids that are commits reachable from rev.
+        """
+        targets = {}
+        for oid in oids:
+            try:
+                targets[self._position(oid)] = oid
+            except ValueError:
+                continue
+        if not targets:
+            return set()
+        floor = min(self._generations[pos] for pos in targets)
+        found = set()
+        for pos in self._walk(self._position(rev), floor):
+            if pos in targets:
+                found.add(targets[pos])
+                if len(found) == len(targets):
+                    break
+        return found
+
+    def count(self, rev, exclude: Iterable[str] = ()):
+        """
+        Count the commits reachable from rev but not from any of
+        exclude, as ``git rev-list --count rev --not exclude``.
+        """
+        return self._count(self._position(rev), map(self._position, exclude))
+
+    def _count(self, start, exclude):
+        """
+        Paint the commits reachable from start and from exclude, in
+        order of descending generation so that each is painted by all
+        of its children before it is visited, and stop once no queued
+        commit is reachable from start alone.
+        """
+        flags: dict[int, int] = {}
+        heap: list[tuple[int, int]] = []
+        interesting = 0
+
+        def paint(pos, flag):
+            nonlocal interesting
+            old = flags.get(pos, 0)
+            new = old | flag
+            if new == old:
+                return
+            flags[pos] = new
+            if not old:
+                heapq.heappush(heap, (-self._generations[pos], pos))
+            interesting += (new == 1) - (old == 1)
+
+        paint(start, 1)
+        for pos in exclude:
+            paint(pos, 2)
+        count = 0
+        while interesting:
+            _, pos = heapq.heappop(heap)
+            flag = flags[pos]
+            if flag == 1:
+                interesting -= 1
+                count += 1
+            for parent in self._parents[pos]:
+                paint(parent, flag)
+        return count
+
+    def nearest(self, rev, candidates: Mapping[str, str]):
+        """
+        Return the name of the nearest of candidates (a mapping of
+        commit to name) reachable from rev, and its distance, the number
+        of commits reachable from rev but not from it, or None if none
+        is reachable.
+        """
+        tagged = {}
+        for oid, name in candidates.items():
+            try:
+                tagged[self._position(oid)] = name
+            except ValueError:
+                continue
+        start = self._position(rev)
+        found = []
+        seen = {start}
+        heap = [(-self._generations[start], start)]
+        while heap:
+            _, pos = heapq.heappop(heap)
+            if pos in tagged:
+                # any candidate behind this one is at least as distant
+                found.append(pos)
+                continue
+            for parent in self._parents[pos]:
+                if parent not in seen:
+                    seen.add(parent)
+                    heapq.heappush(heap, (-self._generations[parent], parent))
+        if not found:
+            return None
+        distances = {pos: self._count(start, [pos]) for pos in found}
+        best = min(found, key=distances.__getitem__)
+        return tagged[best], distances[best]
+
+
+class Graphed:
+    """
+    Mix-in for git Repo implementations answering parent, ancestry and
+    describe queries in-process from a Graph loaded once per instance
+    and the tags of ``ref_snapshot()``.
+    """
+
+    describe_pattern = '*[0-9]*'
+    _graph = None
+
+    def commit_graph(self):
+        if self._graph is None:
+            self._graph = Graph.load(self)
+        return self._graph
+
+    def close(self):
+        if self._graph is not None:
+            self._graph.close()
+            self._graph = None
+        getattr(super(), 'close', lambda: None)()
+
+    def _commit(self, rev=None):
+        """
+        Resolve rev (HEAD by default) to a commit, reading the refs
+        directly where possible.
+        """
+        spec = f'{rev or "HEAD"}^{{commit}}'
+        try:
+            return self.commit_graph().repository.resolve(spec)
+        except (ValueError, KeyError):
+            return self._resolve_rev(spec)
+
+    def get_parent_revs(self, rev=None):
+        return iter(self.commit_graph().parents(self._commit(rev)))
+
+    def is_ancestor(self, ancestor, rev=None):
+        """
+        Is ancestor (e.g. a tag) reachable from rev (HEAD by default)?
+        """
+        return self.commit_graph().is_ancestor(
+            self._commit(ancestor), self._commit(rev)
+        )
+
+    def get_ancestral_tags(self, rev=None):
+        tags = self.ref_snapshot().tags
+        commits = {ref.commit for ref in tags}
+        reachable = self.commit_graph().reachable(self._commit(rev), commits)
+        return (
+            cmd.TaggedRevision(ref.name, ref.short)
+            for ref in tags
+            if ref.commit in reachable
+        )
+
+    def _candidate_tags(self):
+        """
+        Return a dict mapping commits to the name of the preferred tag
+        matching describe_pattern: annotated over lightweight tags, then
+        the most recently tagged.
+        """
+
+        def preference(ref):
+            return (
+                ref.tagged is not None,
+                ref.tagged and ref.tagged.timestamp(),
+                ref.name,
+            )
+
+        tags = (
+            ref
+            for ref in self.ref_snapshot().tags
+            if fnmatch.fnmatchcase(ref.name, self.describe_pattern)
+        )
+        return {ref.commit: ref.name for ref in sorted(tags, key=preference)}
+
+    def nearest_tag(self, rev=None):
+        """
+        Return the nearest tag reachable from rev and the number of
+        commits reachable from rev but not from it, as for
+        ``git describe --tags``.
+        """
+        nearest = self.commit_graph().nearest(self._commit(rev), self._candidate_tags())
+        if nearest is None:
+            raise RuntimeError("No names found, cannot describe anything.")
+        return nearest
+
+    def describe_version(self):
+        head = self._commit()
+        tag, distance = self.nearest_tag(head)
+        repository = self.commit_graph().repository
+        (committer,) = repository.headers(head)['committer']
+        return cmd.Description(
+            date=gitdir.Signature.parse(committer).date,
+            tag=tag,
+            distance=distance,
+            node='g' + repository.objects.abbreviate(head),
+            dirty=self.is_modified(),
+        )
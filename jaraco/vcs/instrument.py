@@ -0,0 +1,181 @@
+"""
+Instrumentation of the commands the repos run.
+
+Each command run by a backend (a process for the ``subprocess`` and
+``aio`` backends, an in-process dispatch for ``library`` or a request
+to the command server or a ``cat-file`` process for ``persistent``) is
+reported as a Call to the
+functions in ``hooks``. While there are none, the only cost is checking
+for them.
+
+>>> repo = getfixture('git_repo')
+>>> with recording() as recorder:
+...     repo.find_files()
+['bar/baz']
+>>> [call.operation for call in recorder.calls]
+['ls-files']
+>>> recorder.by_operation()['ls-files'].calls
+1
+"""
+
+from __future__ import annotations
+
+import collections
+import contextlib
+import json
+import os
+import threading
+import time
+import typing
+from collections.abc import Callable, Sequence
+
+hooks: list[Callable[[Call], None]] = []
+"""
+Functions called with each Call as it completes.
+"""
+
+
+class Call(typing.NamedTuple):
+    repo: str
+    backend: str
+    """The module-qualified name of the Repo class."""
+    argv: tuple[str, ...]
+    start: float
+    """``time.perf_counter()`` when the command started."""
+    seconds: float
+    stdout: int
+    """Bytes of output."""
+    stderr: int
+    returncode: int
+    thread: int
+
+    @property
+    def operation(self):
+        """
+        The subcommand, skipping the global options before it.
+        """
+        params = iter(self.argv[1:])
+        for param in params:
+            if param in ('-c', '-C', '-R', '--config', '--cwd'):
+                next(params, None)
+            elif not param.startswith('-'):
+                return param
+        return ''
+
+
+def emit(repo, argv: Sequence, start, stdout, stderr, returncode):
+    """
+    Report a command that started at start (from ``time.perf_counter``)
+    and just completed to each of the hooks.
+    """
+    call = Call(
+        str(repo.location),
+        f'{type(repo).__module__}.{type(repo).__qualname__}',
+        tuple(map(str, argv)),
+        start,
+        time.perf_counter() - start,
+        stdout,
+        stderr,
+        returncode,
+        threading.get_ident(),
+    )
+    for hook in tuple(hooks):
+        hook(call)
+
+
+@contextlib.contextmanager
+def hooked(func):
+    """
+    Call func with each Call in the context.
+    """
+    hooks.append(func)
+    try:
+        yield func
+    finally:
+        hooks.remove(func)
+
+
+class Stats(typing.NamedTuple):
+    calls: int = 0
+    seconds: float = 0.0
+    stdout: int = 0
+    stderr: int = 0
+    failures: int = 0
+
+    def add(self, call):
+        return Stats(
+            self.calls + 1,
+            self.seconds + call.seconds,
+            self.stdout + call.stdout,
+            self.stderr + call.stderr,
+            self.failures + bool(call.returncode),
+        )
+
+
+class Recorder:
+    """
+    A hook keeping the calls reported to it.
+    """
+
+    def __init__(self):
+        self.calls: list[Call] = []
+
+    def __call__(self, call):
+        self.calls.append(call)
+
+    def _aggregate(self, key):
+        stats: dict[str, Stats] = collections.defaultdict(Stats)
+        for call in self.calls:
+            stats[key(call)] = stats[key(call)].add(call)
+        return dict(stats)
+
+    def by_repo(self):
+        """
+        Return the Stats of the calls for each repo location.
+        """
+        return self._aggregate(lambda call: call.repo)
+
+    def by_operation(self):
+        """
+        Return the Stats of the calls for each operation (subcommand).
+        """
+        return self._aggregate(lambda call: call.operation)
+
+    def trace_events(self):
+        """
+        Return the calls as complete events in the Trace Event Format
+        read by ``chrome://tracing`` and Perfetto.
+        """
+        pid = os.getpid()
+        return [
+            {
+                'name': call.operation,
+                'cat': call.backend,
+                'ph': 'X',
+                'ts': call.start * 1e6,
+                'dur': call.seconds * 1e6,
+                'pid': pid,
+                'tid': call.thread,
+                'args': {
+                    'repo': call.repo,
+                    'argv': call.argv,
+                    'returncode': call.returncode,
+                    'stdout': call.stdout,
+                    'stderr': call.stderr,
+                },
+            }
+            for call in self.calls
+        ]
+
+    def write_trace(self, path):
+        with open(path, 'w', encoding='utf-8') as file:
+            json.dump({'traceEvents': self.trace_events()}, file)
+
+
+@contextlib.contextmanager
+def recording():
+    """
+    Record the calls in the context.
+    """
+    with hooked(Recorder()) as recorder:
+        yield recorder
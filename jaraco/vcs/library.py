@@ -1,22 +1,97 @@
-import sys
+import importlib
+import io
+import os
+import time
 
-from . import base, cmd, reentry
+from . import base, cmd, instrument
+
+
+def _request_class(dispatch):
+    # Mercurial 7.1 moved the request class out of dispatch
+    try:
+        return dispatch.request
+    except AttributeError:
+        return importlib.import_module('mercurial.main_script').request
 
 
 class Mercurial(cmd.Mercurial, base.Repo):
     """
     A Repo implemented by invoking the hg command in-process.
+
+    The ui and repository objects are loaded once and reused for each
+    command, the same way the Mercurial command server does, so that
+    repeated calls avoid re-reading config and re-opening the repo.
+
+    Relative paths are resolved against the location rather than the
+    process working directory (through hg's ``ui.forcecwd``, as hgweb
+    does), which is left unchanged.
     """
 
+    subrepo_workers = 1
+    """
+    Mercurial's in-process dispatch, with its module-level state, is not
+    thread-safe, so find_all_files lists subrepos one at a time.
+    """
+
+    def setup(self):
+        self._ui = None
+        self._repo = None
+
+    def _load(self):
+        from mercurial import cmdutil, hg
+        from mercurial import ui as uimod
+
+        if self._ui is None:
+            self._ui = uimod.ui.load()
+            self._ui.setconfig(b'ui', b'interactive', b'off', b'jaraco.vcs')
+            self._ui.setconfig(b'ui', b'paginate', b'off', b'jaraco.vcs')
+            cwd = os.fsencode(os.path.abspath(self.location))
+            self._ui.setconfig(b'ui', b'forcecwd', cwd, b'jaraco.vcs')
+        if self._repo is None:
+            root = cmdutil.findrepo(os.fsencode(os.path.abspath(self.location)))
+            if root is not None:
+                self._repo = hg.repository(self._ui.copy(), root)
+                self._repoui = self._repo.ui
+
+    def _prepare(self):
+        """
+        Return a ui and repo ready to run a single command, isolating
+        per-command config and refreshing any state changed on disk.
+
+        This relies on internals of Mercurial (``ui.copy``, through
+        which the repo derives per-command uis, and the ui the dirstate
+        keeps in ``_ui``), checked against Mercurial 6.0 and 7.2.
+        """
+        self._load()
+        ui = self._ui.copy()
+        repo = self._repo
+        if repo is not None:
+            repo.baseui = ui
+            repoui = self._repoui.__class__(self._repoui)
+            repoui.copy = ui.copy
+            repo.ui = repo.dirstate._ui = repoui
+            repo.invalidateall()
+        return ui, repo
+
     def _invoke(self, *params):
         """
         Run the self.exe command in-process with the supplied params.
         """
-        cmd = [self.exe, '-R', self.location] + list(params)
-        with reentry.in_process_context(cmd) as result:
-            sys.modules['mercurial.dispatch'].run()
-        stdout = result.stdio.stdout.getvalue()
-        stderr = result.stdio.stderr.getvalue()
-        if not result.returncode == 0:
-            raise RuntimeError(stderr.strip() or stdout.strip())
-        return stdout.decode('utf-8')
+        from mercurial import dispatch
+
+        ui, repo = self._prepare()
+        args = [os.fsencode(param) for param in params]
+        stdout, stderr = io.BytesIO(), io.BytesIO()
+        req = _request_class(dispatch)(
+            args, ui=ui, repo=repo, fin=io.BytesIO(), fout=stdout, ferr=stderr
+        )
+        start = time.perf_counter()
+        returncode = dispatch.dispatch(req) & 255
+        if instrument.hooks:
+            argv = [self.exe, *params]
+            sizes = len(stdout.getvalue()), len(stderr.getvalue())
+            instrument.emit(self, argv, start, *sizes, returncode)
+        if not returncode == 0:
+            raise RuntimeError(stderr.getvalue().strip() or stdout.getvalue().strip())
+        with stdout.getbuffer() as view:
+            return str(view, 'utf-8')
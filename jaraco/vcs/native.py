@@ -0,0 +1,99 @@
+"""
+A Git Repo that reads the repository directory directly, answering
+read-only queries without running the git executable.
+
+>>> repo = getfixture('git_repo')
+>>> _ = repo._invoke('tag', '-am', 'Tagging 1.0', 'v1.0')
+>>> native = Git(repo.location)
+>>> native.get_tags()
+{'v1.0'}
+>>> native.describe_version().tag
+'v1.0'
+"""
+
+from __future__ import annotations
+
+from . import base, cmd, gitdir, graph, refs
+from .subprocess import Subprocess
+
+
+class Git(graph.Graphed, Subprocess, cmd.Git, base.Repo):
+    """
+    A Repo that reads refs and objects (loose and packed) from the
+    ``.git`` directory in-process, answering ancestry and describe
+    queries from a ``graph.Graph`` of the commits read the same way.
+    Operations with no native implementation fall back to invoking git
+    as a subprocess.
+    """
+
+    def setup(self):
+        self._repository = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def close(self):
+        super().close()
+        if self._repository is not None:
+            self._repository.close()
+            self._repository = None
+
+    @property
+    def repository(self):
+        if self._repository is None:
+            self._repository = gitdir.Repository.discover(self.location)
+        return self._repository
+
+    def commit_graph(self):
+        """
+        Read the graph from the commit-graph, if any, and otherwise
+        from the object store as queries reach each commit.
+        """
+        if self._graph is None:
+            repository = self.repository
+            objects_dir = repository.objects.dirs[0]
+            self._graph = graph.Graph.read(objects_dir, repository) or graph.Graph(
+                repository
+            )
+        return self._graph
+
+    def is_valid(self):
+        return gitdir.locate(self.location) is not None
+
+    def _resolve_rev(self, rev=None):
+        try:
+            return self.repository.resolve(rev or 'HEAD')
+        except ValueError as exc:
+            # raised as for the subprocess backends
+            raise RuntimeError(str(exc)) from exc
+
+    def is_modified(self, fallback=True):
+        """
+        Does the working tree differ from HEAD, ignoring untracked files?
+
+        Answered by comparing the index and the stat data of tracked
+        files (see ``gitdir.is_modified``). When that cannot decide, git
+        is asked if fallback is set; otherwise the tree is assumed
+        modified.
+        """
+        modified = gitdir.is_modified(self.location)
+        if modified is None and fallback:
+            return super().is_modified()
+        return modified is not False
+
+    def _load_snapshot(self):
+        return refs.Snapshot.read(self.repository)
+
+    def _headers(self, rev):
+        return self.repository.headers(self._commit(rev))
+
+    def _get_timestamp_str(self, rev):
+        (author,) = self._headers(rev)['author']
+        return gitdir.Signature.parse(author).iso()
+
+    def head_date(self):
+        (committer,) = self._headers('HEAD')['committer']
+        return gitdir.Signature.parse(committer).date
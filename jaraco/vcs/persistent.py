@@ -0,0 +1,246 @@
+"""
+Repo implementations backed by helper processes that are kept running
+for the life of the instance, so that repeated queries avoid the cost
+of spawning a process per call.
+
+>>> repo = getfixture('git_repo')
+>>> with Git(repo.location) as persistent:
+...     persistent.get_tags()
+set()
+"""
+
+from __future__ import annotations
+
+import struct
+import subprocess
+import threading
+import time
+import weakref
+
+from . import base, cmd, gitdir, instrument
+from .subprocess import Subprocess
+
+
+class Pipe:
+    """
+    A long-running helper process answering requests written to its stdin.
+    """
+
+    def __init__(self, args, cwd=None, env=None):
+        self.proc = subprocess.Popen(
+            args,
+            stdin=subprocess.PIPE,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.DEVNULL,
+            cwd=cwd,
+            env=env,
+        )
+        self.lock = threading.Lock()
+        self._finalize = weakref.finalize(self, self._close, self.proc)
+
+    def close(self):
+        self._finalize()
+
+    @staticmethod
+    def _close(proc):
+        proc.stdin.close()
+        proc.wait()
+        proc.stdout.close()
+
+
+class CatFile(Pipe):
+    """
+    A ``git cat-file --batch`` or ``--batch-check`` process.
+    """
+
+    def __init__(self, exe, mode, **kwargs):
+        self.contents = mode == '--batch'
+        super().__init__([exe, 'cat-file', mode], **kwargs)
+
+    def query(self, spec):
+        """
+        Return the object id, type, and (for ``--batch``) the contents
+        of the object named by spec.
+        """
+        if '\n' in spec:
+            raise ValueError(f"Invalid object name {spec!r}")
+        with self.lock:
+            try:
+                self.proc.stdin.write(spec.encode('utf-8') + b'\n')
+                self.proc.stdin.flush()
+            except BrokenPipeError:
+                raise RuntimeError(f"{self.proc.args} exited") from None
+            header = self.proc.stdout.readline().decode('utf-8').split()
+            if len(header) != 3:
+                raise RuntimeError(f"{spec} {' '.join(header[1:]) or 'failed'}")
+            oid, type, size = header
+            body = self.proc.stdout.read(int(size) + 1)[:-1] if self.contents else b''
+        return oid, type, body
+
+
+class CommandServer(Pipe):
+    """
+    An ``hg serve --cmdserver pipe`` process.
+    """
+
+    def __init__(self, exe, **kwargs):
+        args = [exe, 'serve', '--cmdserver', 'pipe', '--config', 'ui.interactive=no']
+        super().__init__(args, **kwargs)
+        channel, hello = self._read_chunk()
+        if channel != b'o' or b'runcommand' not in hello:
+            self.close()
+            raise RuntimeError(f"Unexpected command server greeting {hello!r}")
+
+    def _read_chunk(self):
+        header = self.proc.stdout.read(5)
+        if len(header) < 5:
+            raise RuntimeError(f"{self.proc.args} exited")
+        channel, length = struct.unpack('>cI', header)
+        if channel.isupper():
+            # input requested; length is the size wanted, not a payload
+            return channel, length
+        return channel, self.proc.stdout.read(length)
+
+    def runcommand(self, *args):
+        """
+        Run the hg command with args, returning the exit code and the
+        bytes written to the output and error channels.
+        """
+        data = b'\0'.join(arg.encode('utf-8') for arg in args)
+        output = {b'o': bytearray(), b'e': bytearray()}
+        with self.lock:
+            try:
+                self.proc.stdin.write(b'runcommand\n' + struct.pack('>I', len(data)))
+                self.proc.stdin.write(data)
+                self.proc.stdin.flush()
+            except BrokenPipeError:
+                raise RuntimeError(f"{self.proc.args} exited") from None
+            while True:
+                channel, payload = self._read_chunk()
+                if channel == b'r':
+                    (code,) = struct.unpack('>i', payload)
+                    break
+                if channel in (b'I', b'L'):
+                    # no input is available; answer with end-of-file
+                    self.proc.stdin.write(struct.pack('>I', 0))
+                    self.proc.stdin.flush()
+                elif channel in output:
+                    output[channel] += payload
+                elif channel.isupper():
+                    raise RuntimeError(f"Unsupported required channel {channel!r}")
+        return code, bytes(output[b'o']), bytes(output[b'e'])
+
+
+class Git(Subprocess, cmd.Git, base.Repo):
+    """
+    A Repo that answers object and ref queries through persistent
+    ``git cat-file`` processes, falling back to a subprocess for other
+    commands.
+
+    Call ``close()`` (or use the instance as a context manager) to
+    terminate the helper processes deterministically.
+    """
+
+    def setup(self):
+        self._pipes = {}
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def close(self):
+        for pipe in self._pipes.values():
+            pipe.close()
+        self._pipes.clear()
+
+    def _cat_file(self, mode):
+        try:
+            return self._pipes[mode]
+        except KeyError:
+            pass
+        pipe = CatFile(self.exe, mode, cwd=self.location, env=self.env)
+        return self._pipes.setdefault(mode, pipe)
+
+    def _query(self, mode, spec):
+        """
+        Query the cat-file process for mode about spec, reporting it to
+        the instrument hooks as a ``cat-file`` command.
+        """
+        start = time.perf_counter()
+        returncode, size = 1, 0
+        try:
+            oid, type, body = self._cat_file(mode).query(spec)
+            returncode, size = 0, len(body)
+        finally:
+            if instrument.hooks:
+                argv = [self.exe, 'cat-file', mode, spec]
+                instrument.emit(self, argv, start, size, 0, returncode)
+        return oid, type, body
+
+    def rev_parse(self, rev='HEAD'):
+        """
+        Resolve rev to a full object id.
+        """
+        oid, _, _ = self._query('--batch-check', rev)
+        return oid
+
+    def _resolve_rev(self, rev=None):
+        return self.rev_parse(rev or 'HEAD')
+
+    def _read_commit(self, rev):
+        _, _, body = self._query('--batch', f'{rev}^{{commit}}')
+        return gitdir.parse_headers(body)
+
+    def get_parent_revs(self, rev=None):
+        return iter(self._read_commit(rev or 'HEAD').get('parent', []))
+
+    def _get_timestamp_str(self, rev):
+        (author,) = self._read_commit(rev)['author']
+        return gitdir.Signature.parse(author).iso()
+
+    def head_date(self):
+        (committer,) = self._read_commit('HEAD')['committer']
+        return gitdir.Signature.parse(committer).date
+
+
+class Mercurial(cmd.Mercurial, base.Repo):
+    """
+    A Repo that runs hg commands through a persistent Mercurial command
+    server, paying the interpreter startup cost once per instance.
+
+    Call ``close()`` (or use the instance as a context manager) to
+    terminate the server deterministically.
+    """
+
+    env = None
+
+    def setup(self):
+        self._server = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def close(self):
+        if self._server is not None:
+            self._server.close()
+            self._server = None
+
+    def _invoke(self, *params):
+        """
+        Run the hg command with params on the command server.
+        """
+        if self._server is None:
+            self._server = CommandServer(self.exe, cwd=self.location, env=self.env)
+        start = time.perf_counter()
+        code, stdout, stderr = self._server.runcommand(*params)
+        if instrument.hooks:
+            argv = [self.exe, *params]
+            instrument.emit(self, argv, start, len(stdout), len(stderr), code)
+        if not code == 0:
+            raise RuntimeError(stderr.strip() or stdout.strip())
+        return stdout.decode('utf-8')
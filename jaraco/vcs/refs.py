@@ -0,0 +1,133 @@
+"""
+A snapshot of the refs in a git repo, loaded with one
+``git for-each-ref`` (or read directly from the repository) and indexed
+by name and by commit, from which the tag queries are answered.
+
+>>> repo = getfixture('git_repo')
+>>> _ = repo._invoke('tag', '1.0')
+>>> snapshot = Snapshot.load(repo)
+>>> [ref.name for ref in snapshot.tags]
+['1.0']
+>>> snapshot.tags_at(repo._resolve_rev())
+{'1.0'}
+"""
+
+from __future__ import annotations
+
+import collections
+import datetime
+import typing
+from collections.abc import Iterable
+
+from . import gitdir
+
+
+def _date(value):
+    return datetime.datetime.fromisoformat(value) if value else None
+
+
+class Ref(typing.NamedTuple):
+    refname: str
+    name: str
+    """The short name (e.g. ``1.0`` for ``refs/tags/1.0``)."""
+    target: str
+    """The object the ref points at, a tag object for annotated tags."""
+    short: str
+    """The abbreviated target."""
+    peeled: str
+    """The object an annotated tag points at, or empty."""
+    committed: datetime.datetime | None
+    tagged: datetime.datetime | None
+    """The date of an annotated tag, or None."""
+
+    @property
+    def commit(self):
+        return self.peeled or self.target
+
+
+def _newest_first(ref):
+    return -ref.committed.timestamp() if ref.committed else 0
+
+
+def _is_tag(ref):
+    return ref.refname.startswith('refs/tags/')
+
+
+class Snapshot:
+    """
+    All refs of a repo at one moment, most recently committed first
+    (dating an annotated tag by the commit it points at), then by name.
+    """
+
+    fields = (
+        'refname',
+        'refname:short',
+        'objectname',
+        'objectname:short',
+        '*objectname',
+        'committerdate:iso-strict',
+        '*committerdate:iso-strict',
+        'taggerdate:iso-strict',
+    )
+
+    def __init__(self, refs: Iterable[Ref]):
+        self.refs = tuple(sorted(sorted(refs), key=_newest_first))
+        self.by_name = {ref.refname: ref for ref in self.refs}
+        self.tags = tuple(ref for ref in self.refs if _is_tag(ref))
+        self.by_object: dict[str, list[Ref]] = collections.defaultdict(list)
+        for ref in self.refs:
+            self.by_object[ref.target].append(ref)
+            if ref.peeled:
+                self.by_object[ref.peeled].append(ref)
+
+    @classmethod
+    def load(cls, repo):
+        template = '%00'.join(f'%({field})' for field in cls.fields)
+        output = repo._invoke('for-each-ref', f'--format={template}')
+        return cls(map(cls._parse, filter(None, output.splitlines())))
+
+    @classmethod
+    def read(cls, repository):
+        """
+        Read the tags of the gitdir.Repository repository from its refs
+        and objects, without running git.
+        """
+        tags = []
+        for refname, (target, peeled) in repository.refs.list('refs/tags/').items():
+            commit = peeled or repository.peel(target, '')
+            tagged = None
+            if commit != target:
+                (tagger,) = repository.headers(target).get('tagger', [None])
+                tagged = tagger and gitdir.Signature.parse(tagger).date
+            kind, data = repository.read(commit)
+            committed = None
+            if kind == 'commit':
+                (committer,) = gitdir.parse_headers(data)['committer']
+                committed = gitdir.Signature.parse(committer).date
+            tags.append(
+                Ref(
+                    refname,
+                    refname[len('refs/tags/') :],
+                    target,
+                    repository.objects.abbreviate(target),
+                    peeled=commit if commit != target else '',
+                    committed=committed,
+                    tagged=tagged,
+                )
+            )
+        return cls(tags)
+
+    @staticmethod
+    def _parse(line):
+        refname, name, target, short, peeled, *dates = line.split('\0')
+        committed, peeled_committed, tagged = map(_date, dates)
+        return Ref(
+            refname, name, target, short, peeled, committed or peeled_committed, tagged
+        )
+
+    def tags_at(self, oid):
+        """
+        Return the names of the tags pointing at the object oid, either
+        directly or through an annotated tag.
+        """
+        return {ref.name for ref in self.by_object.get(oid, ()) if _is_tag(ref)}
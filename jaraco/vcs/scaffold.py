@@ -0,0 +1,21 @@
+"""
+Creation of repos, for the test fixtures and the benchmarks.
+"""
+
+
+def init_hg(repo):
+    """
+    Initialize a Mercurial repo at repo.location.
+    """
+    repo._invoke('init', '.')
+    return repo
+
+
+def init_git(repo):
+    """
+    Initialize a git repo at repo.location, with a committer configured.
+    """
+    repo._invoke('init')
+    repo._invoke('config', 'user.email', 'vip@example.com')
+    repo._invoke('config', 'user.name', 'Important User')
+    return repo
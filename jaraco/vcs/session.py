@@ -0,0 +1,104 @@
+"""
+Sessions answering several queries about a repo consistently and
+cheaply.
+
+>>> repo = getfixture('git_repo')
+>>> _ = repo._invoke('tag', '1.0')
+>>> with repo.session() as session:
+...     session.get_tags()
+...     session.get_current_version()
+{'1.0'}
+'1.0'
+"""
+
+from __future__ import annotations
+
+from collections.abc import Iterator
+
+import jaraco.versioning as versioning
+
+
+class Session(versioning.VersionManagement):
+    """
+    A view of a repo in which the current revision is resolved once,
+    on entry, and the result of each query is kept for the life of the
+    session, so that repeated queries agree even if the repo changes
+    meanwhile.
+
+    The tag, ancestry, parent and timestamp queries about the current
+    revision answer for the one resolved on entry. The others
+    (``get_repo_tags``, ``is_modified``, ``describe_version`` and
+    ``find_files``) take no revision and answer for the repo as it is
+    when first called, so they are consistent with the resolved
+    revision only if the repo is unchanged until then.
+
+    Queries run on the repo's session backend, which for the subprocess
+    backends is its persistent counterpart, so that one helper process
+    serves the session. Backends the session started are closed on exit.
+    """
+
+    def __init__(self, repo):
+        self.repo = repo
+        self.increment = repo.increment
+        self._backend = repo._session_backend()
+        self._results: dict[tuple, object] = {}
+        self.head, self._working_parents, self._untagged = self._backend._working_revs()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def close(self):
+        if self._backend is not self.repo:
+            self._backend.close()
+        self._results.clear()
+
+    def __repr__(self):
+        return f'{self.__class__.__name__}({self.repo!r}, head={self.head!r})'
+
+    def _query(self, name, *args):
+        try:
+            return self._results[(name, *args)]
+        except KeyError:
+            pass
+        result = getattr(self._backend, name)(*args)
+        if isinstance(result, Iterator):
+            result = tuple(result)
+        return self._results.setdefault((name, *args), result)
+
+    def get_tags(self, rev=None):
+        if rev is None and self._untagged:
+            return set()
+        return set(self._query('get_tags', rev or self.head))
+
+    def get_repo_tags(self):
+        return iter(self._query('get_repo_tags'))
+
+    def get_ancestral_tags(self, rev=None):
+        return iter(self._query('get_ancestral_tags', rev or self.head))
+
+    def get_parent_revs(self, rev=None):
+        if rev is None and self._working_parents is not None:
+            return iter(self._working_parents)
+        return iter(self._query('get_parent_revs', rev or self.head))
+
+    def get_parent_tags(self, rev=None):
+        try:
+            (parent,) = self.get_parent_revs(rev)
+        except ValueError:
+            return None
+        return self.get_tags(parent)
+
+    def get_timestamp(self, rev):
+        return self._query('get_timestamp', rev)
+
+    def is_modified(self):
+        return self._query('is_modified')
+
+    def describe_version(self):
+        return self._query('describe_version')
+
+    def find_files(self):
+        return list(self._query('find_files'))
@@ -1,7 +1,9 @@
 import os
 import subprocess
+import tempfile
+import time
 
-from . import base, cmd
+from . import base, cmd, instrument
 
 
 class Subprocess:
@@ -12,6 +14,7 @@ class Subprocess:
         Invoke self.exe as a subprocess
         """
         cmd = [self.exe] + list(params)
+        start = time.perf_counter()
         proc = subprocess.Popen(
             cmd,
             stdout=subprocess.PIPE,
@@ -20,10 +23,54 @@ class Subprocess:
             env=self.env,
         )
         stdout, stderr = proc.communicate()
+        if instrument.hooks:
+            instrument.emit(self, cmd, start, len(stdout), len(stderr), proc.returncode)
         if not proc.returncode == 0:
             raise RuntimeError(stderr.strip() or stdout.strip())
         return stdout.decode('utf-8')
 
+    def _stream(self, *params, chunk_size=64 * 1024):
+        """
+        Invoke self.exe as a subprocess, yielding its output as chunks
+        of bytes as they are read. If the generator is closed early,
+        the process is killed.
+        """
+        cmd = [self.exe] + list(params)
+        size = 0
+        with tempfile.TemporaryFile() as stderr:
+            start = time.perf_counter()
+            proc = subprocess.Popen(
+                cmd,
+                stdout=subprocess.PIPE,
+                stderr=stderr,
+                cwd=self.location,
+                env=self.env,
+            )
+            try:
+                with proc.stdout:
+                    for chunk in iter(lambda: proc.stdout.read1(chunk_size), b''):
+                        size += len(chunk)
+                        yield chunk
+            finally:
+                if proc.poll() is None:
+                    proc.kill()
+                proc.wait()
+                if instrument.hooks:
+                    stderr_size = os.fstat(stderr.fileno()).st_size
+                    instrument.emit(
+                        self, cmd, start, size, stderr_size, proc.returncode
+                    )
+            if not proc.returncode == 0:
+                stderr.seek(0)
+                raise RuntimeError(stderr.read().strip())
+
+
+def _rooted_priority(cls, location):
+    """
+    Prefer the command whose repo is rooted at location.
+    """
+    return cls.priority + os.path.isdir(os.path.join(location, cls.marker))
+
 
 class Mercurial(Subprocess, cmd.Mercurial, base.Repo):
     """
@@ -31,7 +78,16 @@ class Mercurial(Subprocess, cmd.Mercurial, base.Repo):
     as a subprocess.
     """
 
-    priority = 1 + os.path.isdir('.hg')
+    priority = 1
+
+    get_priority = classmethod(_rooted_priority)
+
+    def _session_backend(self):
+        from . import persistent
+
+        backend = persistent.Mercurial(self.location)
+        backend.env = self.env
+        return backend
 
 
 class Git(Subprocess, cmd.Git, base.Repo):
@@ -40,4 +96,13 @@ class Git(Subprocess, cmd.Git, base.Repo):
     as a subprocess.
     """
 
-    priority = 1 + os.path.isdir('.git')
+    priority = 1
+
+    get_priority = classmethod(_rooted_priority)
+
+    def _session_backend(self):
+        from . import persistent
+
+        backend = persistent.Git(self.location)
+        backend.env = self.env
+        return backend
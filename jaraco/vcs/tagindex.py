@@ -0,0 +1,174 @@
+"""
+An on-disk index of a repo's tags, their revisions, parsed versions
+and dates, shared across processes and updated incrementally.
+
+>>> repo = getfixture('git_repo')
+>>> _ = repo._invoke('tag', '1.0')
+>>> index = TagIndex(repo)
+>>> entry, = index.update().values()
+>>> entry.version
+'1.0'
+>>> TagIndex(repo).load() == index.load()
+True
+"""
+
+from __future__ import annotations
+
+import contextlib
+import datetime
+import hashlib
+import json
+import os
+import tempfile
+import typing
+
+import packaging.version
+
+from . import base, cmd, gitdir
+
+
+class Entry(typing.NamedTuple):
+    tag: str
+    revision: str
+    version: str | None
+    date: str
+
+    @property
+    def parsed_version(self):
+        return None if self.version is None else packaging.version.Version(self.version)
+
+    @property
+    def timestamp(self):
+        return datetime.datetime.fromisoformat(self.date)
+
+
+def _parse_version(tag):
+    try:
+        return str(packaging.version.Version(tag))
+    except packaging.version.InvalidVersion:
+        return None
+
+
+def _user_cache_dir():
+    root = os.environ.get('XDG_CACHE_HOME') or os.path.join(
+        os.path.expanduser('~'), '.cache'
+    )
+    return os.path.join(root, 'jaraco.vcs')
+
+
+def default_path(repo):
+    """
+    Return the path of the index for repo: inside its ``.git`` or
+    ``.hg`` directory if there is one, otherwise in the user's cache
+    directory.
+    """
+    git_dir = gitdir.locate(repo.location)
+    if git_dir is not None:
+        return os.path.join(gitdir.common_dir(git_dir), 'jaraco.vcs-tags.json')
+    marker = base.find_marker(repo.location, '.hg')
+    if marker is not None:
+        return os.path.join(marker, 'jaraco.vcs-tags.json')
+    digest = hashlib.sha256(os.path.realpath(repo.location).encode()).hexdigest()
+    return os.path.join(_user_cache_dir(), f'{digest[:32]}.json')
+
+
+class TagIndex:
+    """
+    A JSON index of the tags in a repo, written atomically so that
+    concurrent readers always see a complete index.
+    """
+
+    format = 2
+
+    def __init__(self, repo, path=None, source=None):
+        self.repo = repo
+        self.path = path or default_path(repo)
+        self.source = source or repo.get_repo_tags
+
+    def _read(self):
+        try:
+            with open(self.path, encoding='utf-8') as file:
+                data = json.load(file)
+        except (FileNotFoundError, ValueError):
+            return None, {}
+        if data.get('format') != self.format:
+            return None, {}
+        tags = {entry.tag: entry for entry in map(Entry._make, data['tags'])}
+        return data.get('refs_state'), tags
+
+    def load(self):
+        """
+        Return the tags recorded in the index, without updating it.
+        """
+        return self._read()[1]
+
+    def _write(self, refs_state, tags):
+        os.makedirs(os.path.dirname(self.path), exist_ok=True)
+        data = dict(format=self.format, refs_state=refs_state, tags=list(tags.values()))
+        fd, tmp = tempfile.mkstemp(
+            dir=os.path.dirname(self.path), prefix='.tags-', suffix='.tmp'
+        )
+        try:
+            with os.fdopen(fd, 'w', encoding='utf-8') as file:
+                json.dump(data, file)
+            os.replace(tmp, self.path)
+        except BaseException:
+            with contextlib.suppress(FileNotFoundError):
+                os.remove(tmp)
+            raise
+
+    def _refs_state(self):
+        try:
+            state = self.repo._refs_state()
+        except AttributeError:
+            return None
+        # normalize to the form it takes after a JSON round-trip
+        return json.loads(json.dumps(state))
+
+    def update(self):
+        """
+        Bring the index up to date with the repo's tags and return them
+        as a dict of tag name to Entry. Only tags that are new or have
+        moved are examined; if the refs are unchanged since the index
+        was written, the VCS is not queried at all.
+        """
+        stored_state, stored = self._read()
+        state = self._refs_state()
+        if state is not None and state == stored_state:
+            return stored
+        revisions = dict(self.source())
+        changed = [
+            tag
+            for tag, revision in revisions.items()
+            if tag not in stored or stored[tag].revision != revision
+        ]
+        dates = self.repo.get_timestamps(changed) if changed else {}
+        tags = {
+            tag: (
+                Entry(tag, revision, _parse_version(tag), dates[tag].isoformat())
+                if tag in dates
+                else stored[tag]
+            )
+            for tag, revision in revisions.items()
+        }
+        if tags != stored or state != stored_state:
+            self._write(state, tags)
+        return tags
+
+
+class Indexed:
+    """
+    Mix-in for Repo implementations serving ``get_repo_tags`` and the
+    versioning helpers from a TagIndex.
+    """
+
+    def tag_index(self):
+        return TagIndex(self, source=super().get_repo_tags)
+
+    def get_repo_tags(self):
+        tags = self.tag_index().update().values()
+        return (cmd.TaggedRevision(entry.tag, entry.revision) for entry in tags)
+
+    def get_valid_versions(self):
+        tags = self.tag_index().update().values()
+        return (entry.parsed_version for entry in tags if entry.version is not None)
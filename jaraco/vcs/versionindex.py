@@ -0,0 +1,157 @@
+"""
+An in-memory index of a repo's version tags, read from its TagIndex and
+kept in version order, answering the ``jaraco.versioning`` queries
+without re-reading or re-parsing the tags.
+
+>>> repo = getfixture('git_repo')
+>>> _ = repo._invoke('tag', '1.0')
+>>> _ = repo._invoke('tag', 'v1.1')
+>>> index = VersionIndex(repo)
+>>> index.latest().tag
+'v1.1'
+>>> [entry.version for entry in index]
+['1.0', '1.1']
+"""
+
+from __future__ import annotations
+
+import bisect
+import operator
+
+import packaging.version
+
+from . import tagindex
+
+
+class VersionIndex:
+    """
+    The tags of a repo that parse as versions, as the Entries of its
+    TagIndex, sorted by version.
+
+    The TagIndex parses and dates each tag once (and shares the result
+    across processes). This index is refreshed from it when the repo's
+    refs state changes (or on every query for repos without one), and
+    then only entries added or changed since are inserted.
+    """
+
+    def __init__(self, repo, tags=None):
+        self.repo = repo
+        self.tags = tags or tagindex.TagIndex(repo)
+        self.entries: list[tagindex.Entry] = []
+        self._keys: list[packaging.version.Version] = []
+        self._state = None
+
+    def refresh(self):
+        """
+        Bring the index up to date with the repo's tags.
+        """
+        state = self.tags._refs_state()
+        if state is not None and state == self._state:
+            return
+        tags = {
+            tag: entry
+            for tag, entry in self.tags.update().items()
+            if entry.version is not None
+        }
+        if any(tags.get(entry.tag) != entry for entry in self.entries):
+            self.entries = [
+                entry for entry in self.entries if tags.get(entry.tag) == entry
+            ]
+            self._keys = [entry.parsed_version for entry in self.entries]
+        current = set(map(operator.attrgetter('tag'), self.entries))
+        for entry in tags.values():
+            if entry.tag in current:
+                continue
+            version = entry.parsed_version
+            pos = bisect.bisect_right(self._keys, version)
+            self.entries.insert(pos, entry)
+            self._keys.insert(pos, version)
+        self._state = state
+
+    def __iter__(self):
+        self.refresh()
+        return iter(self.entries)
+
+    def __len__(self):
+        self.refresh()
+        return len(self.entries)
+
+    def versions(self):
+        """
+        Return the parsed versions, in order.
+        """
+        self.refresh()
+        return list(self._keys)
+
+    def latest(self):
+        """
+        Return the Entry with the highest version, or None.
+        """
+        self.refresh()
+        return self.entries[-1] if self.entries else None
+
+    def latest_ancestral(self, rev=None):
+        """
+        Return the Entry with the highest version tagging an ancestor
+        of rev (or the current revision), or None.
+        """
+        self.refresh()
+        args = (rev,) if rev is not None else ()
+        ancestral = {tagged.tag for tagged in self.repo.get_ancestral_tags(*args)}
+        for entry in reversed(self.entries):
+            if entry.tag in ancestral:
+                return entry
+        return None
+
+    def in_range(self, lower=None, upper=None):
+        """
+        Return the entries with versions at least lower and less than
+        upper (either given as a Version or a string).
+
+        >>> index = VersionIndex(getfixture('git_repo'))
+        >>> index.in_range('1.0', '2.0')
+        []
+        """
+        self.refresh()
+        start = 0 if lower is None else bisect.bisect_left(self._keys, _version(lower))
+        stop = (
+            len(self._keys)
+            if upper is None
+            else bisect.bisect_left(self._keys, _version(upper))
+        )
+        return self.entries[start:stop]
+
+
+def _version(value):
+    if isinstance(value, packaging.version.Version):
+        return value
+    return packaging.version.Version(value)
+
+
+class VersionIndexed:
+    """
+    Mix-in for Repo implementations serving the ``jaraco.versioning``
+    helpers from a VersionIndex kept for the life of the instance.
+    """
+
+    _version_index = None
+
+    def version_index(self):
+        if self._version_index is None:
+            tags = tagindex.TagIndex(self, source=super().get_repo_tags)
+            self._version_index = VersionIndex(self, tags)
+        return self._version_index
+
+    def get_valid_versions(self):
+        return iter(self.version_index().versions())
+
+    def get_latest_version(self):
+        versions = self.version_index().versions()
+        return versions[-1] if versions else None
+
+    def get_latest_ancestral_version(self, rev=None):
+        """
+        Return the highest version tagged on an ancestor of rev.
+        """
+        latest = self.version_index().latest_ancestral(rev)
+        return latest and latest.parsed_version
@@ -0,0 +1,57 @@
+import asyncio
+
+import pytest
+
+from jaraco.vcs import aio
+
+
+def run(coroutine):
+    return asyncio.run(coroutine)
+
+
+class TestGit:
+    def test_matches_subprocess(self, git_repo):
+        git_repo._invoke('tag', '-am', 'Tagging 1.0', '1.0')
+        repo = aio.Git('.')
+        assert run(repo.is_valid())
+        assert run(repo.get_tags()) == git_repo.get_tags() == {'1.0'}
+        assert run(repo.get_repo_tags()) == list(git_repo.get_repo_tags())
+        assert run(repo.get_ancestral_tags()) == list(git_repo.get_ancestral_tags())
+        assert run(repo.find_files()) == git_repo.find_files()
+        assert run(repo.head_date()) == git_repo.head_date()
+        assert run(repo.get_timestamp('1.0')) == git_repo.get_timestamp('1.0')
+        assert run(repo.describe_version()) == git_repo.describe_version()
+        assert not run(repo.is_modified())
+        with open('bar/baz', 'w', encoding='utf-8') as file:
+            file.write('changed')
+        assert run(repo.is_modified())
+
+    def test_concurrent(self, git_repo):
+        repo = aio.Git('.')
+
+        async def query():
+            return await asyncio.gather(*(repo.get_tags() for _ in range(10)))
+
+        assert run(query()) == [set()] * 10
+
+    def test_error(self, git_repo):
+        with pytest.raises(RuntimeError):
+            run(aio.Git('.').get_tags('no-such-rev'))
+
+    def test_invalid_when_exe_missing(self, git_repo):
+        repo = aio.Git('.')
+        repo.exe = '/non_existent_executable'
+        assert not run(repo.is_valid())
+
+
+class TestMercurial:
+    def test_matches_subprocess(self, hg_repo):
+        hg_repo._invoke('tag', '1.0')
+        repo = aio.Mercurial('.')
+        assert run(repo.get_tags()) == hg_repo.get_tags() == {'tip'}
+        assert run(repo.get_parent_tags('tip')) == {'1.0'}
+        assert run(repo.get_repo_tags()) == list(hg_repo.get_repo_tags())
+        assert run(repo.get_ancestral_tags()) == list(hg_repo.get_ancestral_tags())
+        assert run(repo.find_files()) == hg_repo.find_files()
+        assert not run(repo.is_modified())
+        assert run(repo.describe_version()) == hg_repo.describe_version()
@@ -0,0 +1,45 @@
+import pytest
+
+from jaraco.vcs import batch, subprocess
+
+
+@pytest.fixture
+def repos(git_repo, tmp_path_factory):
+    git_repo._invoke('tag', '1.0')
+    other = subprocess.Git(str(tmp_path_factory.mktemp('other')))
+    other._invoke('init')
+    other._invoke('config', 'user.email', 'vip@example.com')
+    other._invoke('config', 'user.name', 'Important User')
+    other._invoke('commit', '--allow-empty', '-m', 'initial')
+    other._invoke('tag', '2.0')
+    empty = str(tmp_path_factory.mktemp('empty'))
+    return {git_repo.location: '1.0', other.location: '2.0', empty: None}
+
+
+def test_query(repos):
+    results = {result.location: result for result in batch.query(repos)}
+    assert set(results) == set(repos)
+    for location, version in repos.items():
+        result = results[location]
+        if version is None:
+            assert isinstance(result.error, StopIteration)
+            continue
+        assert result.error is None
+        assert result.values == {
+            'version': version,
+            'tags': {version},
+            'modified': False,
+        }
+
+
+def test_query_error(repos):
+    def fail(repo):
+        raise ValueError(repo.location)
+
+    queries = {'tags': lambda repo: repo.get_tags(), 'fail': fail}
+    results = list(batch.query(repos, queries, max_workers=1))
+    assert len(results) == len(repos)
+    assert all(
+        isinstance(result.error, ValueError) for result in results if result.repo
+    )
+    assert all('tags' in result.values for result in results if result.repo)
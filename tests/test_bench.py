@@ -0,0 +1,63 @@
+import os
+
+import pytest
+
+from jaraco.vcs import bench
+
+
+def test_generate_git(tmp_path):
+    spec = bench.Spec(commits=4, tags=2, files=150, submodules=1)
+    repo = bench.generate('git', str(tmp_path / 'repo'), spec)
+    assert sorted(tag for tag, _ in repo.get_repo_tags()) == ['1.1', '1.3']
+    assert len(repo.find_files()) == 150 + 2
+    assert len(list(repo.find_all_files())) == 150 + 2 + 3
+    assert repo._invoke('rev-list', '--count', 'HEAD').strip() == '5'
+
+
+def test_generate_hg(tmp_path):
+    spec = bench.Spec(commits=2, tags=1, files=3, submodules=1)
+    repo = bench.generate('hg', str(tmp_path / 'repo'), spec)
+    assert repo.describe_version().tag == '1.1'
+    assert repo.sub_paths() == ['sub0']
+
+
+def test_counting(git_repo):
+    with bench.counting(git_repo) as counts:
+        git_repo.find_files()
+        list(git_repo.iter_files())
+    assert counts == {'invocations': 1, 'processes': 2}
+    assert '_invoke' not in vars(git_repo)
+
+
+def test_run():
+    spec = bench.Spec(commits=2, tags=1, files=2, submodules=0)
+    results = bench.run(spec, repeat=2, backends=['subprocess.Git'])
+    assert all(result.error is None for result in results)
+    by_operation = {result.operation: result for result in results}
+    assert by_operation['find_files'].processes == 1
+
+
+def test_compare():
+    before = [bench.Result('b', 'op', 0.1, 1, 1), bench.Result('b', 'other', 0.1, 1, 1)]
+    after = [bench.Result('b', 'op', 0.12, 1, 2), bench.Result('b', 'other', 1.0, 1, 1)]
+    messages = list(bench.compare(after, before, tolerance=1.5))
+    assert messages == [
+        'b.op: 2 processes (was 1)',
+        'b.other: 1.0000s (was 0.1000s)',
+    ]
+
+
+def test_main(tmp_path, capsys):
+    results = str(tmp_path / 'results.json')
+    args = ['--commits=2', '--tags=1', '--files=2', '--submodules=0', '--repeat=1']
+    args += ['--backend=subprocess.Git', '--operation=get_tags']
+    assert bench.main([*args, '--json', results]) == 0
+    assert os.path.exists(results)
+    assert bench.main([*args, '--baseline', results, '--tolerance=1000']) == 0
+    assert 'get_tags' in capsys.readouterr().out
+
+
+@pytest.mark.usefixtures('hg_repo')
+def test_library_backend_listed():
+    pytest.importorskip('mercurial')
+    assert 'library.Mercurial' in {name for name, _, _ in bench._backends()}
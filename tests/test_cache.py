@@ -0,0 +1,70 @@
+import pytest
+
+from jaraco.vcs import cache, persistent, subprocess
+
+
+class TestLRUCache:
+    def test_eviction(self):
+        lru = cache.LRUCache(maxsize=2)
+        lru.lookup('a', lambda: 1)
+        lru.lookup('b', lambda: 2)
+        lru.lookup('a', lambda: 0)
+        lru.lookup('c', lambda: 3)
+        assert list(lru.data) == ['a', 'c']
+        assert lru.info() == cache.CacheInfo(hits=1, misses=3, maxsize=2, currsize=2)
+
+
+@pytest.fixture
+def git(git_repo, mixed_in):
+    with mixed_in(cache.Memoized, persistent.Git)('.') as repo:
+        yield repo
+
+
+@pytest.fixture
+def hg(hg_repo, mixed_in):
+    return mixed_in(cache.Memoized, subprocess.Mercurial)('.')
+
+
+class TestGit:
+    def test_tags_invalidated_by_refs(self, git_repo, git):
+        assert git.get_tags() == set()
+        assert git.get_tags() == set()
+        assert git.cache_info().hits == 1
+        git_repo._invoke('tag', '1.0')
+        assert git.get_tags() == {'1.0'}
+        git_repo._invoke('tag', '-d', '1.0')
+        assert git.get_tags() == set()
+
+    def test_keyed_by_hash(self, git_repo, git):
+        head = git_repo._invoke('rev-parse', 'HEAD').strip()
+        timestamp = git.get_timestamp('HEAD')
+        assert git.get_timestamp(head) == timestamp
+        assert git.cache_info().hits == 1
+        git_repo.commit_tree({'bar': {'baz': 'more'}})
+        assert list(git.get_parent_revs()) == [head]
+        assert git.get_timestamp('HEAD~1') == timestamp
+        assert git.cache_info().hits == 2
+
+    def test_head_date(self, git_repo, git):
+        assert git.head_date() == git_repo.head_date()
+        assert git.head_date() == git_repo.head_date()
+        assert git.cache_info().hits == 1
+
+
+class TestMercurial:
+    def test_tags(self, hg):
+        assert hg.get_tags('0') == set()
+        hg._invoke('tag', '-r', '0', '0.1')
+        assert hg.get_tags('0') == {'0.1'}
+        assert hg.get_tags('0') == {'0.1'}
+        assert hg.cache_info().hits == 1
+        assert hg.get_tags() == {'tip'}
+        with open('bar/baz', 'w', encoding='utf-8') as f:
+            f.write('changed')
+        assert hg.get_tags() == set()
+
+    def test_parent_revs(self, hg):
+        assert list(hg.get_parent_revs()) == ['1']
+        assert list(hg.get_parent_revs('1')) == ['0']
+        assert list(hg.get_parent_revs()) == ['1']
+        assert hg.cache_info().hits == 1
@@ -1,10 +1,11 @@
 import datetime
 import os
+import pathlib
 
 import pytest
 
 from jaraco import vcs
-from jaraco.vcs import cmd, subprocess
+from jaraco.vcs import cmd, gitdir, native, subprocess
 
 
 def test_subprocess_manager_invalid_when_exe_missing():
@@ -29,6 +30,10 @@ class TestTags:
         repo._invoke('checkout', '1.0')
         assert repo.get_tags() == {'1.0'}
 
+    def test_unknown_revision(self):
+        with pytest.raises(RuntimeError, match='Needed a single revision'):
+            vcs.Git('.').get_tags('no-such-rev')
+
 
 class TestParseVersion:
     def test_simple(self):
@@ -51,3 +56,320 @@ class TestIsolation:
     def test_commits_not_signed(self, git_repo):
         output = git_repo._invoke('log', '--show-signature')
         assert 'Signature made' not in output
+
+
+@pytest.mark.usefixtures("git_repo")
+class TestAncestralTags:
+    def test_only_ancestors(self):
+        repo = vcs.Git('.')
+        repo._invoke('tag', '-am', 'tagging 1.0', '1.0')
+        repo.commit_tree({'bar': {'baz': 'more'}})
+        repo._invoke('tag', '1.1')
+        repo._invoke('checkout', '-q', '-b', 'side', '1.0')
+        repo.commit_tree({'bar': {'baz': 'side'}})
+        repo._invoke('tag', '1.0.post1')
+        tags = list(repo.get_ancestral_tags())
+        assert {tag for tag, _ in tags} == {'1.0.post1', '1.0'}
+        # same order and revisions as the full listing
+        all_tags = list(repo.get_repo_tags())
+        assert tags == [tagged for tagged in all_tags if tagged.tag != '1.1']
+        assert {tag for tag, _ in repo.get_ancestral_tags('1.1')} == {'1.1', '1.0'}
+
+    def test_annotated_by_commit_date(self, monkeypatch):
+        repo = vcs.Git('.')
+        for day, tag, annotated in [
+            (1, 'light', False),
+            (2, 'ann', True),
+            (3, '2.0', True),
+        ]:
+            monkeypatch.setenv('GIT_COMMITTER_DATE', f'2020-01-0{day}T00:00:00Z')
+            repo.commit_tree({'bar': {'baz': tag}})
+            repo._invoke('tag', *(['-am', tag] if annotated else []), tag)
+        expected = ['2.0', 'ann', 'light']
+        assert [tag for tag, _ in repo.get_ancestral_tags()] == expected
+        assert [tag for tag, _ in repo.get_repo_tags()] == expected
+
+
+class TestIterFiles:
+    def test_unusual_names(self, git_repo):
+        git_repo.commit_tree({
+            'new\nline': '',
+            'caf\N{LATIN SMALL LETTER E WITH ACUTE}': '',
+        })
+        files = set(git_repo.iter_files())
+        assert files == {
+            'bar/baz',
+            'new\nline',
+            'caf\N{LATIN SMALL LETTER E WITH ACUTE}',
+        }
+        assert set(git_repo.iter_files(decode=False)) == set(map(os.fsencode, files))
+
+    def test_lazy(self, git_repo):
+        files = git_repo.iter_files()
+        assert next(files) == 'bar/baz'
+        files.close()
+        assert list(files) == []
+
+    def test_error(self, tmp_path):
+        with pytest.raises(RuntimeError):
+            list(subprocess.Git(str(tmp_path)).iter_files())
+
+
+@pytest.fixture
+def superproject(git_repo, tmp_path_factory, monkeypatch):
+    """
+    A repo with two submodules, the first with a nested submodule.
+    """
+    monkeypatch.setenv('GIT_ALLOW_PROTOCOL', 'file')
+    cwd = os.getcwd()
+
+    def make(name, spec):
+        repo = subprocess.Git(str(tmp_path_factory.mktemp(name)))
+        repo._invoke('init', '-q')
+        repo._invoke('config', 'user.email', 'vip@example.com')
+        repo._invoke('config', 'user.name', 'Important User')
+        monkeypatch.chdir(repo.location)
+        repo.commit_tree(spec)
+        return repo
+
+    def add(repo, source, path):
+        repo._invoke('submodule', 'add', '-q', source, path)
+        repo._invoke('submodule', 'update', '--init', '--recursive', '-q')
+        repo._invoke('commit', '-q', '-m', f'add {path}')
+
+    inner = make('inner', {'inner.txt': ''})
+    outer = make('outer', {'outer.txt': ''})
+    other = make('other', {'other.txt': ''})
+    add(outer, inner.location, 'nested')
+    monkeypatch.chdir(cwd)
+    add(git_repo, outer.location, 'outer')
+    add(git_repo, other.location, 'other')
+    return git_repo
+
+
+class TestSubmodules:
+    expected = [
+        '.gitmodules',
+        'bar/baz',
+        'other',
+        'outer',
+        './other/other.txt',
+        './outer/.gitmodules',
+        './outer/nested',
+        './outer/outer.txt',
+        './outer/nested/inner.txt',
+    ]
+
+    def test_sub_paths(self, superproject):
+        assert superproject.sub_paths() == ['other', 'outer']
+
+    def test_find_all_files(self, superproject):
+        superproject.location = '.'
+        assert list(superproject.find_all_files()) == self.expected
+        assert list(superproject.find_all_files(max_workers=1)) == self.expected
+
+    def test_iter_all_files(self, superproject):
+        superproject.location = '.'
+        assert list(superproject.iter_all_files()) == self.expected
+
+    def test_uninitialized(self, superproject):
+        superproject._invoke('submodule', 'deinit', '-q', '--all')
+        assert list(superproject.sub_paths()) == []
+
+
+class TestIsModified:
+    def test_clean(self, git_repo):
+        assert not git_repo.is_modified()
+        os.utime('bar/baz')
+        assert not git_repo.is_modified()
+        assert not native.Git('.').is_modified(fallback=False)
+
+    def test_untracked_ignored(self, git_repo):
+        pathlib.Path('untracked').write_text('', encoding='utf-8')
+        assert not git_repo.is_modified()
+
+    def test_edited(self, git_repo):
+        pathlib.Path('bar/baz').write_text('changed', encoding='utf-8')
+        assert git_repo.is_modified()
+        assert native.Git('.').is_modified(fallback=False)
+
+    def test_staged(self, git_repo):
+        pathlib.Path('bar/baz').write_text('changed', encoding='utf-8')
+        git_repo._invoke('add', 'bar/baz')
+        assert git_repo.is_modified()
+
+    def test_deleted(self, git_repo):
+        os.remove('bar/baz')
+        assert git_repo.is_modified()
+
+    def test_intent_to_add(self, git_repo):
+        pathlib.Path('new').write_text('', encoding='utf-8')
+        git_repo._invoke('add', '-N', 'new')
+        assert git_repo.is_modified()
+
+    @pytest.mark.parametrize('version', [2, 4])
+    def test_index_versions(self, git_repo, version):
+        git_repo._invoke('update-index', '--index-version', str(version))
+        git_repo._invoke('write-tree')
+        assert gitdir.Index.read('.git/index').version == version
+        assert gitdir.is_modified() is False
+        git_repo._invoke('rm', '-q', '--cached', 'bar/baz')
+        git_repo._invoke('write-tree')
+        assert gitdir.is_modified() is True
+
+    def test_skip_worktree(self, git_repo):
+        git_repo._invoke('update-index', '--skip-worktree', 'bar/baz')
+        git_repo._invoke('write-tree')
+        # extended flags require index version 3
+        assert gitdir.Index.read('.git/index').version == 3
+        pathlib.Path('bar/baz').write_text('changed', encoding='utf-8')
+        assert gitdir.is_modified() is False
+
+    def test_filters(self, git_repo):
+        pathlib.Path('bar/baz').write_text('changed', encoding='utf-8')
+        assert gitdir.is_modified() is True
+        pathlib.Path('bar/.gitattributes').write_text('* text', encoding='utf-8')
+        assert gitdir.is_modified() is None
+        os.remove('bar/.gitattributes')
+        git_repo._invoke('config', 'core.autocrlf', 'false')
+        assert gitdir.is_modified() is True
+        git_repo._invoke('config', 'core.autocrlf', 'input')
+        assert gitdir.is_modified() is None
+
+    def test_file_mode(self, git_repo):
+        os.chmod('bar/baz', 0o755)
+        git_repo._invoke('add', 'bar/baz')
+        git_repo._invoke('commit', '-qm', 'executable')
+        os.chmod('bar/baz', 0o644)
+        assert gitdir.is_modified() is True
+        git_repo._invoke('config', 'core.fileMode', 'false')
+        assert gitdir.is_modified() is False
+        assert not git_repo.is_modified()
+
+    def test_symlinks_as_files(self, git_repo):
+        os.symlink('bar/baz', 'link')
+        git_repo._invoke('add', 'link')
+        git_repo._invoke('commit', '-qm', 'link')
+        os.remove('link')
+        pathlib.Path('link').write_text('bar/baz', encoding='utf-8')
+        assert gitdir.is_modified() is True
+        git_repo._invoke('config', 'core.symlinks', 'false')
+        assert gitdir.is_modified() is False
+        pathlib.Path('link').write_text('bar', encoding='utf-8')
+        assert gitdir.is_modified() is True
+
+    def test_staged_without_cached_tree(self, git_repo):
+        pathlib.Path('bar/baz').write_text('changed', encoding='utf-8')
+        git_repo._invoke('add', 'bar/baz')
+        # the cache-tree is invalidated, so git is left to decide
+        assert gitdir.is_modified() is None
+        git_repo._invoke('commit', '-qm', 'changed')
+        assert gitdir.is_modified() is False
+
+    def test_fallback(self, git_repo, monkeypatch):
+        monkeypatch.setattr(gitdir, 'is_modified', lambda location: None)
+        repo = native.Git('.')
+        assert not repo.is_modified()
+        assert repo.is_modified(fallback=False)
+        pathlib.Path('bar/baz').write_text('changed', encoding='utf-8')
+        assert repo.is_modified()
+
+
+class TestDescribe:
+    @pytest.fixture
+    def invocations(self, monkeypatch):
+        calls = []
+        orig = subprocess.Git._invoke
+
+        def _invoke(self, *params):
+            calls.append(params)
+            return orig(self, *params)
+
+        monkeypatch.setattr(subprocess.Git, '_invoke', _invoke)
+        return calls
+
+    def test_invocations(self, git_repo, invocations):
+        git_repo._invoke('tag', '1.0')
+        git_repo.commit_tree({'bar': {'baz': 'more'}})
+        invocations.clear()
+        desc = git_repo.describe_version()
+        assert [params[2] for params in invocations] == ['log', 'diff']
+        assert isinstance(desc, cmd.Description)
+        assert (desc.tag, desc.distance, desc.dirty) == ('1.0', 1, False)
+        assert (
+            desc.node == 'g' + git_repo._invoke('rev-parse', '--short', 'HEAD').strip()
+        )
+        assert desc.date == git_repo.head_date()
+
+    def test_cached_while_refs_unchanged(self, git_repo, invocations):
+        git_repo._invoke('tag', '1.0')
+        desc = git_repo.describe_version()
+        invocations.clear()
+        pathlib.Path('bar/baz').write_text('changed', encoding='utf-8')
+        assert git_repo.describe_version() == desc._replace(dirty=True)
+        assert invocations == [cmd.Git._diff_cmd]
+        git_repo._invoke('tag', '-d', '1.0')
+        git_repo._invoke('tag', '2.0')
+        assert git_repo.describe_version().tag == '2.0'
+
+    def test_legacy_git(self, git_repo, monkeypatch):
+        git_repo._invoke('tag', '1.0')
+        expected = git_repo.describe_version()
+        # simulate a git that leaves the describe placeholder unexpanded
+        cmd_ = cmd.Git._describe_log_cmd[:-1] + ('--format=%cI%x00%h%x00%%(describe)',)
+        monkeypatch.setattr(cmd.Git, '_describe_log_cmd', cmd_)
+        assert subprocess.Git('.').describe_version() == expected
+
+    def test_no_tags(self, git_repo):
+        with pytest.raises(RuntimeError):
+            git_repo.describe_version()
+
+
+class TestTimestamps:
+    def test_bulk(self, git_repo):
+        git_repo._invoke('tag', '-am', 'tagging 1.0', '1.0')
+        git_repo.commit_tree({'bar': {'baz': 'more'}})
+        git_repo._invoke('tag', '1.1')
+        revs = ['1.1', '1.0', 'HEAD~1']
+        stamps = git_repo.get_timestamps(revs)
+        assert list(stamps) == revs
+        assert stamps == {rev: git_repo.get_timestamp(rev) for rev in revs}
+
+    def test_same_commit(self, git_repo):
+        git_repo._invoke('tag', '1.0')
+        stamps = git_repo.get_timestamps(['1.0', 'HEAD', 'HEAD~1'])
+        assert stamps['1.0'] == stamps['HEAD'] == git_repo.get_timestamp('HEAD')
+        assert stamps['HEAD~1'] == git_repo.get_timestamp('HEAD~1')
+
+    def test_empty(self, git_repo):
+        assert git_repo.get_timestamps([]) == {}
+
+    def test_unknown(self, git_repo):
+        with pytest.raises(RuntimeError):
+            git_repo.get_timestamps(['no-such-rev'])
+
+
+class TestAge:
+    def test_honors_location(self, git_repo, tmp_path_factory, monkeypatch):
+        git_repo.location = os.getcwd()
+        monkeypatch.chdir(tmp_path_factory.mktemp('elsewhere'))
+        assert git_repo.first_commit_date() == git_repo.get_timestamp('HEAD~1')
+
+    def test_cached(self, git_repo, monkeypatch):
+        git_repo.location = os.getcwd()
+        first = git_repo.first_commit_date()
+        monkeypatch.setattr(
+            subprocess.Git, '_invoke', lambda *args: pytest.fail("not cached")
+        )
+        assert subprocess.Git(git_repo.location).first_commit_date() == first
+        assert git_repo.age() >= datetime.timedelta(0)
+
+    def test_multiple_roots(self, git_repo):
+        git_repo._invoke('checkout', '-q', '--orphan', 'other')
+        git_repo.commit_tree({'other': ''})
+        git_repo._invoke('checkout', '-q', 'master')
+        git_repo._invoke('merge', '-q', '--allow-unrelated-histories', 'other')
+        roots = git_repo._invoke('rev-list', '--max-parents=0', 'HEAD').split()
+        assert len(roots) == 2
+        git_repo._first_commit_dates.clear()
+        assert git_repo.first_commit_date() == min(map(git_repo.get_timestamp, roots))
@@ -0,0 +1,130 @@
+import itertools
+
+import pytest
+
+from jaraco.vcs import graph, subprocess
+
+
+def commit(repo, *parents):
+    args = ['commit-tree', 'HEAD^{tree}', '-m', 'commit']
+    for parent in parents:
+        args += ['-p', parent]
+    return repo._invoke(*args).strip()
+
+
+@pytest.fixture
+def history(git_repo):
+    """
+    A history with merges, one of them an octopus, and tags.
+    """
+    base = git_repo._resolve_rev()
+    git_repo._invoke('tag', '-am', 'Tagging 1.0', '1.0')
+    a1 = commit(git_repo, base)
+    a2 = commit(git_repo, a1)
+    b1 = commit(git_repo, base)
+    merge = commit(git_repo, a2, b1)
+    c1 = commit(git_repo, base)
+    d1 = commit(git_repo, a1)
+    octopus = commit(git_repo, merge, c1, d1)
+    git_repo._invoke('tag', '1.1', b1)
+    git_repo._invoke('tag', '2.0', a2)
+    git_repo._invoke('tag', 'other', c1)
+    git_repo._invoke('reset', '-q', octopus)
+    return dict(base=base, a1=a1, a2=a2, b1=b1, merge=merge, c1=c1, octopus=octopus)
+
+
+def write_graph(repo, layout):
+    if layout == 'commit-graph':
+        repo._invoke('commit-graph', 'write', '--reachable')
+    if layout == 'split':
+        repo._invoke('reset', '-q', 'HEAD~')
+        repo._invoke('commit-graph', 'write', '--reachable', '--split')
+        repo._invoke('reset', '-q', 'HEAD@{1}')
+        repo._invoke('commit-graph', 'write', '--reachable', '--split=no-merge')
+    if layout == 'stale':
+        repo._invoke('reset', '-q', 'HEAD~')
+        repo._invoke('commit-graph', 'write', '--reachable')
+        repo._invoke('reset', '-q', 'HEAD@{1}')
+
+
+def is_ancestor(repo, ancestor, rev):
+    try:
+        repo._invoke('merge-base', '--is-ancestor', ancestor, rev)
+    except RuntimeError:
+        return False
+    return True
+
+
+@pytest.fixture
+def graphed(mixed_in):
+    return mixed_in(graph.Graphed, subprocess.Git)('.')
+
+
+@pytest.fixture(params=['rev-list', 'commit-graph', 'split', 'stale'])
+def repo(request, history, graphed):
+    write_graph(graphed, request.param)
+    return graphed
+
+
+def test_layouts(repo, history):
+    commits = repo.commit_graph()
+    for oid in history.values():
+        parents = repo._invoke('log', '-1', '--format=%P', oid).split()
+        assert commits.parents(oid) == parents
+        expected = 1 + max(map(commits.generation, parents), default=0)
+        assert commits.generation(oid) == expected
+    for ancestor, rev in itertools.permutations(history.values(), 2):
+        assert commits.is_ancestor(ancestor, rev) == is_ancestor(repo, ancestor, rev)
+
+
+def test_stale(history, graphed):
+    write_graph(graphed, 'stale')
+    commits = graphed.commit_graph()
+    assert history['merge'] in commits.index
+    assert history['octopus'] not in commits.index
+    assert (
+        commits.generation(history['octopus'])
+        == commits.generation(history['merge']) + 1
+    )
+    with pytest.raises(ValueError):
+        commits.generation('0' * 40)
+
+
+def test_split(history, graphed):
+    write_graph(graphed, 'split')
+    assert len(graphed.commit_graph()) == len(
+        graphed._invoke('rev-list', '--all').split()
+    )
+    chain = '.git/objects/info/commit-graphs/commit-graph-chain'
+    with open(chain, encoding='ascii') as file:
+        assert len(file.read().split()) == 2
+
+
+def test_count(repo, history):
+    commits = repo.commit_graph()
+    octopus, b1 = history['octopus'], history['b1']
+    expected = repo._invoke('rev-list', '--count', octopus, '--not', b1).strip()
+    assert commits.count(octopus, [b1]) == int(expected)
+    assert commits.count(octopus) == int(repo._invoke('rev-list', '--count', 'HEAD'))
+
+
+def test_queries(repo, history):
+    for rev in ('HEAD', history['a1'], history['b1'], '1.0'):
+        reference = list(subprocess.Git.get_ancestral_tags(repo, rev))
+        assert sorted(repo.get_ancestral_tags(rev)) == sorted(reference)
+    assert list(repo.get_parent_revs()) == repo.commit_graph().parents(
+        history['octopus']
+    )
+    assert repo.is_ancestor('1.1')
+    assert not repo.is_ancestor('HEAD', '1.1')
+
+
+def test_describe(repo):
+    desc = repo.describe_version()
+    assert desc.tag == '2.0'
+    assert desc.distance == int(repo._invoke('rev-list', '--count', '2.0..HEAD'))
+    assert desc.node == 'g' + repo._invoke('rev-parse', '--short', 'HEAD').strip()
+    assert desc.date == repo.head_date()
+    repo._invoke('reset', '-q', '--hard', '1.0')
+    assert repo.describe_version() == subprocess.Git.describe_version(repo)
+    repo.close()
@@ -0,0 +1,52 @@
+import os
+import subprocess
+import sys
+
+import pytest
+
+import jaraco.vcs
+from jaraco.vcs import subprocess as backends
+
+heavy = ['dateutil', 'tempora', 'jaraco.path', 'concurrent.futures']
+
+
+def loaded_modules(code):
+    script = f"import sys\n{code}\nprint(*sys.modules, sep='\\n')"
+    env = dict(os.environ, PYTHONPATH=os.pathsep.join(sys.path))
+    output = subprocess.check_output([sys.executable, '-c', script], env=env)
+    return output.decode().split()
+
+
+def test_import_is_cheap():
+    modules = loaded_modules('import jaraco.vcs')
+    assert 'jaraco.vcs' in modules
+    assert 'jaraco.vcs.base' not in modules
+    assert 'more_itertools' not in modules
+    assert not set(heavy) & set(modules)
+
+
+def test_current_version_is_cheap(git_repo):
+    modules = loaded_modules(
+        'import jaraco.vcs; jaraco.vcs.repo().get_current_version()'
+    )
+    assert 'jaraco.vcs.subprocess' in modules
+    assert not set(heavy) & set(modules)
+
+
+def test_bench_without_pytest():
+    assert 'pytest' not in loaded_modules('import jaraco.vcs.bench')
+
+
+def test_lazy_attributes():
+    assert jaraco.vcs.Git is backends.Git
+    with pytest.raises(AttributeError):
+        jaraco.vcs.Bogus  # noqa: B018
+
+
+def test_priority_at_location(hg_repo, tmp_path_factory, monkeypatch):
+    location = os.getcwd()
+    assert backends.Mercurial.get_priority(location) == 2
+    assert backends.Git.get_priority(location) == 1
+    monkeypatch.chdir(tmp_path_factory.mktemp('elsewhere'))
+    assert backends.Mercurial.get_priority(location) == 2
+    assert isinstance(jaraco.vcs.repo(location), backends.Mercurial)
@@ -0,0 +1,86 @@
+import json
+
+import pytest
+
+from jaraco.vcs import instrument
+
+
+def test_records_calls(git_repo):
+    with instrument.recording() as recorder:
+        git_repo._invoke('tag', '1.0')
+        list(git_repo.iter_files())
+        with pytest.raises(RuntimeError):
+            git_repo._invoke('rev-parse', 'missing')
+    assert not instrument.hooks
+    tag, files, failed = recorder.calls
+    assert tag.argv == ('git', 'tag', '1.0')
+    assert tag.backend == 'jaraco.vcs.subprocess.Git'
+    assert tag.returncode == 0
+    assert files.operation == 'ls-files'
+    assert files.stdout == len(b'bar/baz\0')
+    assert failed.returncode and failed.stderr
+    stats = recorder.by_operation()
+    assert stats['rev-parse'].failures == 1
+    assert recorder.by_repo()[git_repo.location].calls == 3
+
+
+def test_stream_closed_early(git_repo):
+    with instrument.recording() as recorder:
+        stream = git_repo._stream('log', '--format=%H')
+        next(stream)
+        stream.close()
+    (call,) = recorder.calls
+    assert call.operation == 'log'
+    assert call.stdout > 0
+
+
+@pytest.mark.parametrize(
+    'argv, operation',
+    [
+        (('git', '-c', 'a.b=c', 'submodule', 'add'), 'submodule'),
+        (('hg', '--config', 'ui.x=1', '-q', 'log'), 'log'),
+        (('git', '--version'), ''),
+    ],
+)
+def test_operation(argv, operation):
+    call = instrument.Call('.', 'jaraco.vcs.subprocess.Git', argv, 0.0, 0.0, 0, 0, 0, 0)
+    assert call.operation == operation
+
+
+def test_trace(hg_repo, tmp_path):
+    with instrument.recording() as recorder:
+        hg_repo.get_tags()
+    path = tmp_path / 'trace.json'
+    recorder.write_trace(path)
+    (event,) = json.loads(path.read_text(encoding='utf-8'))['traceEvents']
+    assert event['ph'] == 'X'
+    assert event['cat'] == 'jaraco.vcs.subprocess.Mercurial'
+    assert event['args']['argv'][0] == 'hg'
+    assert event['dur'] > 0
+
+
+def test_cat_file(git_repo):
+    from jaraco.vcs import persistent
+
+    with instrument.recording() as recorder, persistent.Git('.') as repo:
+        repo.head_date()
+        with pytest.raises(RuntimeError):
+            repo.rev_parse('missing')
+    read, missing = recorder.calls
+    assert read.backend == 'jaraco.vcs.persistent.Git'
+    assert read.argv[1:] == ('cat-file', '--batch', 'HEAD^{commit}')
+    assert read.operation == 'cat-file'
+    assert read.stdout > 0
+    assert missing.returncode
+
+
+def test_library(hg_repo):
+    pytest.importorskip('mercurial')
+    from jaraco.vcs import library
+
+    with instrument.recording() as recorder:
+        library.Mercurial(hg_repo.location).find_files()
+    (call,) = recorder.calls
+    assert call.backend == 'jaraco.vcs.library.Mercurial'
+    assert call.operation == 'locate'
+    assert call.stdout > 0
@@ -0,0 +1,57 @@
+import os
+
+import pytest
+
+from jaraco.vcs import bench, library
+
+pytest.importorskip('mercurial')
+
+
+@pytest.fixture
+def library_hg(hg_repo):
+    return library.Mercurial('.')
+
+
+class TestMercurial:
+    def test_matches_subprocess(self, hg_repo, library_hg):
+        assert library_hg.find_files() == [os.path.join('bar', 'baz')]
+        hg_repo._invoke('tag', '1.0')
+        assert library_hg.get_tags() == hg_repo.get_tags() == {'tip'}
+        assert library_hg.get_parent_tags('tip') == {'1.0'}
+        assert list(library_hg.get_repo_tags()) == list(hg_repo.get_repo_tags())
+
+    def test_location_other_than_cwd(self, hg_repo, tmp_path_factory, monkeypatch):
+        repo = library.Mercurial(os.getcwd())
+        monkeypatch.chdir(tmp_path_factory.mktemp('elsewhere'))
+        monkeypatch.setattr(os, 'chdir', None)
+        assert repo.find_files() == [os.path.join('bar', 'baz')]
+
+    def test_find_all_files(self, tmp_path):
+        spec = bench.Spec(commits=1, tags=0, files=2, submodules=3)
+        reference = bench.generate('hg', str(tmp_path / 'repo'), spec)
+        repo = library.Mercurial(reference.location)
+        assert list(repo.find_all_files()) == list(reference.find_all_files())
+
+    def test_reuses_repo(self, library_hg):
+        library_hg.get_tags()
+        loaded = library_hg._repo
+        library_hg.get_tags()
+        assert library_hg._repo is loaded
+
+    def test_sees_external_changes(self, hg_repo, library_hg):
+        assert library_hg.get_tags('0') == set()
+        hg_repo._invoke('tag', '-r', '0', '0.1')
+        assert library_hg.get_tags('0') == {'0.1'}
+        assert not library_hg.is_modified()
+        with open('bar/baz', 'w', encoding='utf-8') as f:
+            f.write('changed')
+        assert library_hg.is_modified()
+
+    def test_config_does_not_persist(self, library_hg):
+        library_hg._invoke('--config', 'jaraco.setting=1', 'status')
+        with pytest.raises(RuntimeError):
+            library_hg._invoke('config', 'jaraco.setting')
+
+    def test_error(self, library_hg):
+        with pytest.raises(RuntimeError, match='unknown revision'):
+            library_hg.get_timestamp('no-such-rev')
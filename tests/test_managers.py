@@ -1,8 +1,13 @@
+import gc
+import os
+import shutil
+import weakref
 from unittest import mock
 
 import pytest
 
 from jaraco import vcs
+from jaraco.vcs import subprocess
 
 
 def test_existing_only():
@@ -30,3 +35,50 @@ def test_no_valid_implementations():
     with pytest.raises(StopIteration) as err:
         vcs.Repo.detect()
     assert 'no source repo' in str(err).lower()
+
+
+class TestDetectionCache:
+    def test_marker_absent_skips_executable(self, git_repo, monkeypatch):
+        """
+        A Mercurial manager is ruled out by the missing .hg directory
+        without running hg.
+        """
+
+        def fail(self):
+            raise AssertionError("is_valid should not be called")
+
+        monkeypatch.setattr(subprocess.Mercurial, 'is_valid', fail)
+        assert isinstance(vcs.Repo.detect('.'), vcs.Git)
+
+    def test_cached_until_marker_replaced(self, git_repo, monkeypatch):
+        calls = []
+        orig = subprocess.Git.is_valid
+
+        def is_valid(self):
+            calls.append(self)
+            return orig(self)
+
+        monkeypatch.setattr(subprocess.Git, 'is_valid', is_valid)
+        vcs.Repo.detect('.')
+        vcs.Repo.detect('.')
+        assert len(calls) == 1
+        os.rename('.git', '.git-old')
+        shutil.copytree('.git-old', '.git')
+        vcs.Repo.detect('.')
+        assert len(calls) == 2
+
+    def test_classes_not_retained(self, git_repo):
+        combined = type('Combined', (subprocess.Git,), {})
+        assert combined('.')._is_valid_cached()
+        ref = weakref.ref(combined)
+        del combined
+        gc.collect()
+        assert ref() is None
+
+    def test_bounded(self, git_repo, monkeypatch, tmp_path):
+        monkeypatch.setattr(vcs.Repo, '_detection_cache', {})
+        monkeypatch.setattr(vcs.Repo, '_detection_cache_size', 2)
+        for name in 'abc':
+            shutil.copytree('.git', tmp_path / name / '.git')
+            subprocess.Git(str(tmp_path / name))._is_valid_cached()
+        assert len(vcs.Repo._detection_cache) == 2
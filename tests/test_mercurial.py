@@ -55,6 +55,11 @@ class TestRelativePaths:
         test_mgr = vcs.Mercurial('bar')
         assert test_mgr.find_files() == ['baz']
 
+    def test_iter_files_in_child(self):
+        test_mgr = vcs.Mercurial('bar')
+        assert list(test_mgr.iter_files()) == ['baz']
+        assert list(test_mgr.iter_files(decode=False)) == [b'baz']
+
     def test_current_dir_in_child(self):
         os.chdir('bar')
         test_mgr = vcs.Mercurial('.')
@@ -164,3 +169,94 @@ class TestRevisionTimestamp:
         mgr = vcs.Mercurial('.')
         mgr._invoke('tag', '1.0')
         assert mgr.get_timestamp('1.0').date() == datetime.date.today()
+
+
+@pytest.mark.usefixtures("hg_repo")
+class TestDescribe:
+    def test_describe(self):
+        repo = vcs.Mercurial('.')
+        with pytest.raises(RuntimeError):
+            repo.describe_version()
+        repo._invoke('tag', '-r', '0', '1.0')
+        desc = repo.describe_version()
+        assert (desc.tag, desc.distance, desc.dirty) == ('1.0', 2, False)
+        node = repo._invoke('identify', '--id').strip()
+        assert desc.node == 'h' + node
+        assert desc.date == repo.get_timestamp('.')
+        with open(os.path.join('bar', 'baz'), 'w', encoding='utf-8') as file:
+            file.write('pending')
+        assert repo.describe_version() == desc._replace(dirty=True)
+
+    def test_multiple_tags(self):
+        repo = vcs.Mercurial('.')
+        repo._invoke('tag', '-r', '1', '1.0', '1.0.0')
+        assert repo.describe_version().tag in ('1.0', '1.0.0')
+
+    def test_skips_tags_without_digits(self):
+        repo = vcs.Mercurial('.')
+        repo._invoke('tag', '-r', '0', '1.0')
+        repo._invoke('tag', '-r', '1', 'stable')
+        desc = repo.describe_version()
+        assert (desc.tag, desc.distance) == ('1.0', 3)
+
+
+@pytest.mark.usefixtures("hg_repo")
+class TestTemplatedQueries:
+    def test_get_tags_single_invocation(self, monkeypatch):
+        repo = vcs.Mercurial('.')
+        repo._invoke('tag', '-r', '0', '1.0', 'with space')
+        calls = []
+        orig = subprocess.Mercurial._invoke
+
+        def _invoke(self, *params):
+            calls.append(params)
+            return orig(self, *params)
+
+        monkeypatch.setattr(subprocess.Mercurial, '_invoke', _invoke)
+        assert repo.get_tags('0') == {'1.0', 'with space'}
+        assert repo.get_tags() == {'tip'}
+        assert len(calls) == 2
+
+    def test_modified_working_copy_has_no_tags(self):
+        repo = vcs.Mercurial('.')
+        with open(os.path.join('bar', 'baz'), 'w', encoding='utf-8') as file:
+            file.write('pending')
+        assert repo.get_tags() == set()
+
+    def test_ancestral_tags_only_tagged(self):
+        repo = vcs.Mercurial('.')
+        repo._invoke('tag', '-r', '0', '1.0')
+        node = repo._invoke('log', '-r', '0', '--template', '{node|short}')
+        # ordered by date, which may be the same second for both
+        assert sorted(repo.get_ancestral_tags()) == [
+            ('1.0', node),
+            ('tip', repo._invoke('identify', '--id').strip()),
+        ]
+
+    def test_parent_revs(self):
+        repo = vcs.Mercurial('.')
+        assert list(repo.get_parent_revs()) == ['1']
+        assert list(repo.get_parent_revs('1')) == ['0']
+
+
+@pytest.mark.usefixtures("hg_repo")
+class TestTimestamps:
+    def test_bulk(self):
+        repo = vcs.Mercurial('.')
+        repo._invoke('tag', '-r', '0', "it's 1.0")
+        stamps = repo.get_timestamps(["it's 1.0", 'tip', '1'])
+        assert list(stamps) == ["it's 1.0", 'tip', '1']
+        assert stamps['1'] == repo.get_timestamp('1')
+
+    def test_same_changeset(self):
+        repo = vcs.Mercurial('.')
+        repo._invoke('tag', '-r', '0', "it's {1.0}")
+        stamps = repo.get_timestamps(['tip', '.', '0', "it's {1.0}"])
+        assert list(stamps) == ['tip', '.', '0', "it's {1.0}"]
+        assert stamps['.'] == stamps['tip'] == repo.get_timestamp('tip')
+        assert stamps['0'] == stamps["it's {1.0}"] == repo.get_timestamp('0')
+
+
+def test_age(hg_repo):
+    assert hg_repo.first_commit_date() == hg_repo.get_timestamp('0')
+    assert hg_repo.age() >= datetime.timedelta(0)
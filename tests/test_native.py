@@ -0,0 +1,73 @@
+import pytest
+
+from jaraco.vcs import native
+
+
+@pytest.fixture
+def tagged_repo(git_repo):
+    git_repo._invoke('tag', '-am', 'Tagging 1.0', '1.0')
+    for content in 'abc':
+        git_repo.commit_tree({'bar': {'baz': content * 100}, 'other': content})
+    git_repo._invoke('tag', '1.1')
+    git_repo.commit_tree({'bar': {'baz': 'final'}})
+    return git_repo
+
+
+def assert_matches(subject, reference):
+    assert subject.get_tags() == reference.get_tags()
+    assert subject.get_tags('1.0') == reference.get_tags('1.0')
+    assert subject.get_tags('HEAD~1') == reference.get_tags('HEAD~1') == {'1.1'}
+    assert list(subject.get_repo_tags()) == list(reference.get_repo_tags())
+    assert subject.head_date() == reference.head_date()
+    assert subject.get_timestamp('1.0') == reference.get_timestamp('1.0')
+    assert subject.describe_version() == reference.describe_version()
+    parents = reference._invoke('log', '-1', '--format=%P', 'HEAD~2').split()
+    assert list(subject.get_parent_revs('HEAD~2')) == parents
+
+
+class TestGit:
+    def test_loose(self, tagged_repo):
+        assert_matches(native.Git('.'), tagged_repo)
+
+    def test_packed(self, tagged_repo):
+        tagged_repo._invoke('gc', '--aggressive', '--quiet')
+        assert_matches(native.Git('.'), tagged_repo)
+
+    def test_repacked(self, tagged_repo):
+        tagged_repo._invoke('gc', '--quiet')
+        repo = native.Git('.')
+        assert repo.get_tags('1.1') == {'1.1'}
+        tagged_repo.commit_tree({'bar': {'baz': 'after'}})
+        tagged_repo._invoke('tag', '1.2')
+        tagged_repo._invoke('gc', '--quiet')
+        assert repo.get_tags() == {'1.2'}
+        assert repo.describe_version() == tagged_repo.describe_version()
+        assert list(repo.get_repo_tags()) == list(tagged_repo.get_repo_tags())
+
+    def test_valid_without_executable(self, tagged_repo):
+        repo = native.Git('.')
+        repo.exe = '/non_existent_executable'
+        assert repo.is_valid()
+        assert repo.get_tags('1.0') == {'1.0'}
+        assert repo.describe_version() == tagged_repo.describe_version()
+        expected = list(tagged_repo.get_ancestral_tags('HEAD~1'))
+        assert list(repo.get_ancestral_tags('HEAD~1')) == expected
+
+    def test_unknown_revision(self, tagged_repo):
+        repo = native.Git('.')
+        with pytest.raises(RuntimeError, match='unknown revision'):
+            repo.get_tags('no-such-rev')
+        with pytest.raises(RuntimeError):
+            repo.get_parent_revs('no-such-rev')
+        with pytest.raises(RuntimeError):
+            repo.get_timestamp('no-such-rev')
+
+    def test_names_of_git_files(self, tagged_repo):
+        tagged_repo._invoke('tag', 'config')
+        tagged_repo._invoke('tag', 'description')
+        tagged_repo._invoke('branch', 'index', 'HEAD~1')
+        repo = native.Git('.')
+        assert repo.get_tags('config') == tagged_repo.get_tags('config')
+        assert repo.get_tags('index') == tagged_repo.get_tags('index') == {'1.1'}
+        parents = tagged_repo._invoke('log', '-1', '--format=%P', 'index').split()
+        assert list(repo.get_parent_revs('index')) == parents
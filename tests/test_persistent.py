@@ -0,0 +1,80 @@
+import os
+
+import pytest
+
+from jaraco import vcs
+from jaraco.vcs import persistent
+
+
+@pytest.fixture
+def persistent_git(git_repo):
+    with persistent.Git('.') as repo:
+        yield repo
+
+
+class TestGit:
+    def test_tags_match_subprocess(self, git_repo, persistent_git):
+        git_repo._invoke('tag', '-am', 'Tagging 1.0', '1.0')
+        git_repo.commit_tree({'bar': {'baz': 'more'}})
+        git_repo._invoke('tag', '1.1')
+        assert persistent_git.get_tags() == git_repo.get_tags() == {'1.1'}
+        assert persistent_git.get_tags('1.0') == git_repo.get_tags('1.0')
+        assert list(persistent_git.get_repo_tags()) == list(git_repo.get_repo_tags())
+
+    def test_tags_refresh(self, git_repo, persistent_git):
+        assert persistent_git.get_tags() == set()
+        git_repo._invoke('tag', '1.0')
+        assert persistent_git.get_tags() == {'1.0'}
+
+    def test_dates_match_subprocess(self, git_repo, persistent_git):
+        assert persistent_git.head_date() == git_repo.head_date()
+        assert persistent_git.get_timestamp('HEAD') == git_repo.get_timestamp('HEAD')
+
+    def test_parent_revs(self, git_repo, persistent_git):
+        (parent,) = persistent_git.get_parent_revs()
+        assert parent == git_repo._invoke('rev-parse', 'HEAD~1').strip()
+
+    def test_missing_rev(self, persistent_git):
+        with pytest.raises(RuntimeError):
+            persistent_git.get_tags('no-such-rev')
+
+    def test_valid_manager(self, persistent_git):
+        managers = vcs.Repo.get_valid_managers('.')
+        assert persistent.Git in {type(mgr) for mgr in managers}
+
+
+@pytest.fixture
+def persistent_hg(hg_repo):
+    with persistent.Mercurial('.') as repo:
+        yield repo
+
+
+class TestMercurial:
+    def test_tags_match_subprocess(self, hg_repo, persistent_hg):
+        hg_repo._invoke('tag', '1.0')
+        hg_repo._invoke('update', '1.0')
+        assert persistent_hg.get_tags() == hg_repo.get_tags() == {'1.0'}
+        assert persistent_hg.get_parent_tags('tip') == {'1.0'}
+        assert list(persistent_hg.get_repo_tags()) == list(hg_repo.get_repo_tags())
+
+    def test_ancestral_tags(self, hg_repo, persistent_hg):
+        persistent_hg._invoke('tag', '1.0')
+        actual = list(persistent_hg.get_ancestral_tags())
+        assert actual == list(hg_repo.get_ancestral_tags())
+
+    def test_files_and_status(self, persistent_hg):
+        assert persistent_hg.find_files() == [os.path.join('bar', 'baz')]
+        assert not persistent_hg.is_modified()
+        with open('bar/baz', 'w', encoding='utf-8') as f:
+            f.write('changed')
+        assert persistent_hg.is_modified()
+
+    def test_error(self, persistent_hg):
+        with pytest.raises(RuntimeError, match='unknown revision'):
+            persistent_hg.get_timestamp('no-such-rev')
+
+    def test_one_server(self, persistent_hg):
+        persistent_hg.get_tags()
+        server = persistent_hg._server
+        persistent_hg.get_tags()
+        assert persistent_hg._server is server
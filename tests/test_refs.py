@@ -0,0 +1,40 @@
+from jaraco.vcs import gitdir, instrument, refs, subprocess
+
+
+def test_annotated(git_repo):
+    git_repo._invoke('tag', '-a', '-m', 'release', '1.0')
+    snapshot = refs.Snapshot.load(git_repo)
+    ref = snapshot.by_name['refs/tags/1.0']
+    head = git_repo._resolve_rev()
+    assert ref.commit == head != ref.target
+    assert ref.tagged is not None
+    assert ref.committed == git_repo.head_date()
+    assert snapshot.tags_at(head) == snapshot.tags_at(ref.target) == {'1.0'}
+    assert snapshot.by_name[
+        'refs/heads/' + git_repo._invoke('branch', '--show-current').strip()
+    ]
+
+
+def test_read(git_repo):
+    git_repo._invoke('tag', '-a', '-m', 'release', '1.0')
+    git_repo.commit_tree({'bar': {'baz': 'changed'}})
+    git_repo._invoke('tag', '1.1')
+    loaded = refs.Snapshot.load(git_repo)
+    repository = gitdir.Repository.discover(git_repo.location)
+    try:
+        assert refs.Snapshot.read(repository).tags == loaded.tags
+    finally:
+        repository.close()
+
+
+def test_reused_until_refs_change(git_repo):
+    git_repo._invoke('tag', '1.0')
+    with instrument.recording() as recorder:
+        assert git_repo.get_tags() == {'1.0'}
+    assert [call.operation for call in recorder.calls] == ['for-each-ref']
+    with instrument.recording() as recorder:
+        assert subprocess.Git('.').get_tags() == {'1.0'}
+        assert [tag for tag, _ in git_repo.get_repo_tags()] == ['1.0']
+    assert recorder.calls == []
+    git_repo._invoke('tag', '1.1')
+    assert subprocess.Git('.').get_tags() == {'1.0', '1.1'}
@@ -0,0 +1,69 @@
+from jaraco.vcs import instrument, native, persistent
+
+
+def test_pins_head(git_repo):
+    git_repo._invoke('tag', '1.0')
+    with git_repo.session() as session:
+        assert session.get_current_version() == '1.0'
+        git_repo.commit_tree({'bar': {'baz': 'changed'}})
+        git_repo._invoke('tag', '1.1')
+        assert session.get_tags() == {'1.0'}
+        assert session.get_current_version() == '1.0'
+        assert session.get_parent_tags() == set()
+    assert git_repo.get_current_version() == '1.1'
+
+
+def test_one_process(git_repo):
+    with git_repo.session() as session:
+        backend = session._backend
+        assert isinstance(backend, persistent.Git)
+        with instrument.recording() as recorder:
+            session.get_tags()
+            session.get_tags()
+            session.get_current_version()
+        # cat-file queries go to the helper started on entry
+        operations = [call.operation for call in recorder.calls]
+        assert operations == ['for-each-ref', 'cat-file']
+    assert not backend._pipes
+
+
+def test_mercurial(hg_repo):
+    hg_repo._invoke('tag', '1.0')
+    with hg_repo.session() as session:
+        assert isinstance(session._backend, persistent.Mercurial)
+        (parent,) = session.get_parent_revs()
+        assert parent == session.head
+        assert session.get_tags() == {'tip'}
+        assert session.get_parent_tags('tip') == {'1.0'}
+        assert session.get_current_version() == '1.0'
+    assert session._backend._server is None
+
+
+def test_modified_working_copy(hg_repo):
+    hg_repo._invoke('tag', '-r', '.', '1.0')
+    hg_repo._invoke('update', '-q', '1.0')
+    with open('bar/baz', 'w', encoding='utf-8') as file:
+        file.write('pending')
+    assert hg_repo.get_current_version() == '1.0.1.dev0'
+    with hg_repo.session() as session:
+        assert session.get_tags() == set()
+        assert session.get_current_version() == hg_repo.get_current_version()
+
+
+def test_merge_in_progress(hg_repo):
+    hg_repo._invoke('update', '-q', 'null')
+    with open('other', 'w', encoding='utf-8') as file:
+        file.write('other')
+    hg_repo._invoke('commit', '-qAm', 'other root')
+    hg_repo._invoke('merge', '-q', '0')
+    with hg_repo.session() as session:
+        assert len(list(session.get_parent_revs())) == 2
+        assert session.get_parent_tags() is None
+
+
+def test_reused_results(git_repo):
+    git_repo._invoke('tag', '1.0')
+    repo = native.Git('.')
+    with repo.session() as session:
+        assert session._backend is repo
+        assert session.describe_version() is session.describe_version()
@@ -0,0 +1,59 @@
+import os
+
+from jaraco.vcs import subprocess, tagindex
+
+
+def test_incremental(git_repo, monkeypatch):
+    git_repo._invoke('tag', '1.0')
+    index = tagindex.TagIndex(git_repo)
+    assert list(index.update()) == ['1.0']
+    assert os.path.dirname(index.path) == os.path.abspath('.git')
+
+    looked_up = []
+    orig = subprocess.Git.get_timestamps
+
+    def get_timestamps(self, revs):
+        looked_up.extend(revs)
+        return orig(self, revs)
+
+    monkeypatch.setattr(subprocess.Git, 'get_timestamps', get_timestamps)
+    git_repo.commit_tree({'bar': {'baz': 'more'}})
+    git_repo._invoke('tag', 'v1.1')
+    git_repo._invoke('tag', 'not-a-version')
+    tags = index.update()
+    assert set(tags) == {'1.0', 'v1.1', 'not-a-version'}
+    assert tags['v1.1'].version == '1.1'
+    assert tags['not-a-version'].version is None
+    assert sorted(looked_up) == ['not-a-version', 'v1.1']
+
+    git_repo._invoke('tag', '-d', '1.0')
+    assert set(index.update()) == {'v1.1', 'not-a-version'}
+    assert len(looked_up) == 2
+
+
+def test_unchanged_refs_skip_vcs(git_repo, monkeypatch, mixed_in):
+    git_repo._invoke('tag', '1.0')
+    repo = mixed_in(tagindex.Indexed, subprocess.Git)('.')
+    assert list(repo.get_repo_tags()) == list(git_repo.get_repo_tags())
+
+    def fail(self):
+        raise AssertionError("should not query tags")
+
+    monkeypatch.setattr(subprocess.Git, 'get_repo_tags', fail)
+    assert str(repo.get_latest_version()) == '1.0'
+    assert repo.get_current_version() == '1.0'
+
+
+def test_user_cache(tmp_path, monkeypatch):
+    monkeypatch.setenv('XDG_CACHE_HOME', str(tmp_path / 'cache'))
+    repo = subprocess.Git(str(tmp_path))
+    path = tagindex.default_path(repo)
+    assert path.startswith(str(tmp_path / 'cache' / 'jaraco.vcs'))
+
+
+def test_mercurial(hg_repo, mixed_in):
+    hg_repo._invoke('tag', '-r', '0', '0.1')
+    repo = mixed_in(tagindex.Indexed, subprocess.Mercurial)('.')
+    assert dict(repo.get_repo_tags()) == dict(hg_repo.get_repo_tags())
+    assert os.path.exists(os.path.join('.hg', 'jaraco.vcs-tags.json'))
+    assert str(repo.get_latest_version()) == '0.1'
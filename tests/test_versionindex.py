@@ -0,0 +1,75 @@
+import packaging.version
+import pytest
+
+from jaraco.vcs import subprocess, tagindex, versionindex
+
+
+@pytest.fixture
+def indexed_git(mixed_in):
+    return mixed_in(versionindex.VersionIndexed, subprocess.Git)('.')
+
+
+def test_incremental(git_repo, monkeypatch):
+    git_repo._invoke('tag', '1.0')
+    git_repo._invoke('tag', 'not-a-version')
+    parsed = []
+    orig = tagindex._parse_version
+
+    def parse(tag):
+        parsed.append(tag)
+        return orig(tag)
+
+    monkeypatch.setattr(tagindex, '_parse_version', parse)
+    index = versionindex.VersionIndex(git_repo)
+    assert [entry.tag for entry in index] == ['1.0']
+    git_repo.commit_tree({'bar': {'baz': 'more'}})
+    git_repo._invoke('tag', '0.9')
+    git_repo._invoke('tag', '2.0')
+    assert [entry.tag for entry in index] == ['0.9', '1.0', '2.0']
+    assert sorted(parsed) == ['0.9', '1.0', '2.0', 'not-a-version']
+    git_repo._invoke('tag', '-d', '2.0')
+    assert index.latest().tag == '1.0'
+    assert index.latest().timestamp == git_repo.get_timestamp('1.0')
+
+
+def test_no_requery_when_unchanged(git_repo, monkeypatch, indexed_git):
+    git_repo._invoke('tag', '1.0')
+    repo = indexed_git
+    assert str(repo.get_latest_version()) == '1.0'
+
+    def fail(self):
+        raise AssertionError("should not query tags")
+
+    monkeypatch.setattr(subprocess.Git, 'get_repo_tags', fail)
+    assert list(map(str, repo.get_valid_versions())) == ['1.0']
+    assert repo.get_current_version() == '1.0'
+
+
+def test_latest_ancestral(git_repo, indexed_git):
+    repo = indexed_git
+    assert repo.get_latest_version() is None
+    git_repo._invoke('tag', '1.0')
+    git_repo._invoke('checkout', '-q', '-b', 'side', 'HEAD~1')
+    git_repo.commit_tree({'bar': {'baz': 'side'}})
+    git_repo._invoke('tag', '2.0')
+    git_repo._invoke('checkout', '-q', 'master')
+    assert str(repo.get_latest_version()) == '2.0'
+    assert str(repo.get_latest_ancestral_version()) == '1.0'
+    assert str(repo.get_latest_ancestral_version('side')) == '2.0'
+
+
+def test_in_range(git_repo):
+    for tag in ('0.9', '1.0', '1.0.1', '1.1', '2.0'):
+        git_repo._invoke('tag', tag)
+    index = versionindex.VersionIndex(git_repo)
+    tags = [entry.tag for entry in index.in_range('1.0', '2.0')]
+    assert tags == ['1.0', '1.0.1', '1.1']
+    upper = packaging.version.Version('1.0.1')
+    assert [entry.tag for entry in index.in_range(upper=upper)] == ['0.9', '1.0']
+
+
+def test_mercurial(hg_repo, mixed_in):
+    hg_repo._invoke('tag', '-r', '0', '0.1')
+    repo = mixed_in(versionindex.VersionIndexed, subprocess.Mercurial)('.')
+    assert str(repo.get_latest_version()) == '0.1'
+    assert str(repo.get_latest_ancestral_version()) == '0.1'